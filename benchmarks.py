@@ -0,0 +1,109 @@
+""" Mesures de performances (temps d'import, temps de calcul) """
+
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+# Modules lourds qui ne doivent pas être chargés par le chemin d'import léger (ajustement et métriques)
+HEAVY_MODULES = ["matplotlib", "seaborn", "pandas", "PyQt6", "tabulate"]
+# Budget de temps d'import (en secondes) au-delà duquel on considère qu'il y a une régression
+IMPORT_BUDGET = {"libs.utils": 1.5, "libs.distributions": 1.5, "libs.report": 0.5}
+
+# ==================================================
+# region Import Benchmarks
+# ==================================================
+##################################################
+def measure_import(module: str, repeat: int = 3):
+    """
+    Mesure le temps d'import d'un module dans un interpréteur neuf (le cache de sys.modules faussant sinon la mesure)
+    :param module: Nom du module à importer
+    :param repeat: Nombre de mesures (on garde la meilleure)
+    :return: Un dictionnaire contenant le temps d'import (en secondes) et les modules lourds chargés
+    """
+    code = (f"import sys, time\n"
+            f"t = time.perf_counter()\n"
+            f"import {module}\n"
+            f"print(time.perf_counter() - t)\n"
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    times, heavy = [], []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split("\n")
+        times.append(float(out[0]))
+        heavy = [m for m in out[1].split(",") if m]
+    return dict(Time=min(times), Heavy=heavy)
+
+##################################################
+def check_imports(budget: dict = None):
+    """
+    Vérifie que les imports restent légers (aucun module lourd chargé et temps sous le budget)
+    :param budget: Dictionnaire module -> temps maximal en secondes (par défaut IMPORT_BUDGET)
+    :return: Liste des régressions trouvées (vide si tout va bien)
+    """
+    if budget is None: budget = IMPORT_BUDGET
+    errors = []
+    for module, limit in budget.items():
+        res = measure_import(module)
+        print(f"Import {module} : {res['Time']:.3f}s (budget {limit}s), modules lourds : {res['Heavy'] or 'aucun'}")
+        if res["Heavy"]:        errors.append(f"{module} charge {', '.join(res['Heavy'])}")
+        if res["Time"] > limit: errors.append(f"{module} met {res['Time']:.3f}s à s'importer (budget {limit}s)")
+    return errors
+
+# ==================================================
+# endregion Import Benchmarks
+# ==================================================
+
+# ==================================================
+# region Memory Benchmarks
+# ==================================================
+##################################################
+def measure_memory(n: int = 100000, low_memory: bool = False, dtype=None, distributions: list = None):
+    """
+    Mesure le pic mémoire (via tracemalloc, qui suit les allocations numpy) de l'analyse d'une colonne par check_distributions,
+    sans figure (le chemin de la ligne de commande et du service)
+    :param n: Nombre de valeurs de la colonne
+    :param low_memory: Mode mémoire réduite des analyses
+    :param dtype: Type de stockage (np.float32 par exemple)
+    :param distributions: Liste des distributions à tester (par défaut toutes)
+    :return: Un dictionnaire contenant le pic pendant l'analyse, la mémoire conservée par le résultat (en Mo) et le temps (en secondes)
+    """
+    from libs.distributions import ALL_DISTRIBUTIONS, check_distributions
+    if distributions is None: distributions = ALL_DISTRIBUTIONS
+    data = np.random.gamma(3.7, 2.0, n)
+    tracemalloc.start()
+    t = time.perf_counter()
+    result = check_distributions(data, distributions, low_memory=low_memory, dtype=dtype, discrete=False, plot=False)
+    t = time.perf_counter() - t
+    kept, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return dict(Peak=peak / 2 ** 20, Kept=kept / 2 ** 20, Time=t)
+
+##################################################
+def compare_memory(n: int = 100000):
+    """
+    Affiche le pic mémoire et la mémoire conservée avec et sans le mode mémoire réduite.
+    low_memory réduit surtout la mémoire conservée (les distributions générées sont libérées au fil de l'analyse).
+    Le pic est celui de la famille la plus coûteuse : sa distribution générée et la mémoire de travail de ses métriques (tri et fusion
+    des tests à deux échantillons, KDE et EM des mélanges en float64). float32 ne divise par deux que les données et les distributions générées.
+    :param n: Nombre de valeurs de la colonne
+    """
+    print(f"Mémoire pour {n} valeurs (données d'entrée : {n * 8 / 2 ** 20:.1f} Mo, non comptées)")
+    for name, kwargs in {"Standard": dict(),
+                         "Low memory": dict(low_memory=True),
+                         "Low memory float32": dict(low_memory=True, dtype=np.float32)}.items():
+        res = measure_memory(n, **kwargs)
+        print(f"  {name:<20} : pic {res['Peak']:8.1f} Mo, conservé {res['Kept']:8.1f} Mo, {res['Time']:.2f}s")
+
+# ==================================================
+# endregion Memory Benchmarks
+# ==================================================
+
+##################################################
+if __name__ == "__main__":
+    compare_memory()
+    regressions = check_imports()
+    for r in regressions: print(f"Régression : {r}")
+    sys.exit(1 if regressions else 0)
@@ -1,17 +1,25 @@
 """ Classes des distributions """
 
 import math
+import os
 import warnings
 from abc import ABC, abstractmethod
+from functools import partial
+from typing import TYPE_CHECKING
 
-import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
-import seaborn as sns
 from scipy import stats
-from scipy.optimize import minimize
+from scipy.optimize import minimize  # Déjà chargé par scipy.stats, aucun coût supplémentaire
 
-from libs.utils import get_kde, get_kde_curve_mse, get_kde_mse, box_cox_test
+if TYPE_CHECKING: import matplotlib.pyplot as plt
+
+# Matplotlib, seaborn et pandas ne sont importés qu'à leur première utilisation (figures et dataframes).
+# L'ajustement (fit) et le calcul des métriques (get_results) n'en ont pas besoin : "from libs.distributions import Normal" reste léger.
+
+from libs.mixtures import MixtureDistribution, sample_mixture, select_mixture
+from libs.models import FittedModel
+from libs.utils import (as_readonly, box_cox_test, collapse, get_curve_mse, get_kde, get_ks, get_moments, is_integer_data, load_data,
+                        run_tasks, two_sample_tests)
 
 # ==================================================
 # region Combine Functions
@@ -31,59 +39,272 @@ def get_values(analysis, head, columns):
         tmp += f"{key} ({value}) "
     res.append(tmp)
     for i in range(2, len(columns)):
-        tmp = analysis.results[columns[i]]
-        if isinstance(tmp, dict):   res.append(analysis.results[columns[i]]["P"])
-        else:                       res.append(analysis.results[columns[i]])
+        tmp = analysis.results.get(columns[i], np.nan)  # Métriques non calculées (classement par vraisemblance seule) : NaN
+        if isinstance(tmp, dict):   res.append(tmp["P"])
+        else:                       res.append(tmp)
     return res
 
+# Colonnes de tri de combine_distributions : métriques KDE (par défaut) ou critères de vraisemblance (calcul rapide, sans tirage aléatoire)
+RANKINGS = {"metrics": ["MSE", "MSE Scale", "MSE Curve", "Delta Kurtosis", "Delta Skewness"],
+            "likelihood": ["BIC", "AIC", "Distribution"]}
+
+# Mode progressif (voir check_distributions) : taille du premier sous-échantillon, facteur entre deux étapes,
+# nombre de familles dont l'ordre doit être stable et écart maximal toléré sur leur statistique de Kolmogorov-Smirnov
+PROGRESSIVE_START = 1000
+PROGRESSIVE_FACTOR = 10
+PROGRESSIVE_TOP_K = 2
+PROGRESSIVE_TOLERANCE = 0.02
+
 ##################################################
-def check_distributions(data: np.ndarray, distributions: list = None):
+def check_distributions(data, distributions: list = None, low_memory: bool = False, dtype=None, weights=None, discrete: bool = None,
+                        plot: bool = True, threads: int = 1, progressive: bool = False, callback=None, metrics: bool = True,
+                        workers: int = 1):
     """
     Lance une analyse sur toutes les distributions et renvoie une figure des histogrammes et le résultat des analyses
     :param distributions: Liste des distributions à tester (par Défaut None signifie toutes)
-    :param data: Distribution à analyser
+    :param discrete: Ajoute les distributions discrètes (DISCRETE_DISTRIBUTIONS) à la liste, None pour les ajouter si les données sont des entiers positifs
+    :param data: Distribution à analyser ou chemin d'un fichier (.npy, .parquet, .arrow, .bin, .csv, voir load_data)
+    :param weights: Poids ou effectifs de chaque valeur (histogramme déjà agrégé (valeur, effectif)), None pour des données brutes
+    :param low_memory: Libère les distributions générées une fois les métriques calculées (voir _BaseDistribution)
+    :param dtype: Type de stockage des données (np.float32 divise la mémoire par deux), None conserve le type d'origine
+    :param plot: Dessine les histogrammes (False évite d'importer matplotlib, la figure vaut alors None)
+    :param threads: Nombre de threads pour les métriques de chaque distribution (voir _BaseDistribution)
+    :param progressive: Analyse des sous-échantillons emboîtés de taille croissante (1k, 10k, 100k, ...) et s'arrête dès que le classement
+    des PROGRESSIVE_TOP_K premières familles et leur statistique de Kolmogorov-Smirnov (à PROGRESSIVE_TOLERANCE près) ne changent plus
+    :param callback: Fonction appelée avec le résultat (provisoire) de chaque étape du mode progressif (la figure vaut alors None)
+    :param metrics: Si faux, seuls la log-vraisemblance, l'AIC et le BIC sont calculés et les distributions sont classées par BIC
+    (résultat déterministe, aucune figure). Avec des familles discrètes et continues, le classement est toujours celui du BIC
+    (vraisemblance des familles continues sur des classes unitaires, voir _BaseDistribution.discretize).
+    :param workers: Nombre de processus (une famille par tâche). Les données, leur copie triée et leurs statistiques (voir data_statistics)
+    sont placées une seule fois en mémoire partagée (voir libs.shared) au lieu d'être copiées vers chaque processus.
+    Les distributions générées restent dans les processus : la figure est dessinée avec un nouveau tirage de chaque modèle.
     :return: Un dictionnaire contennant les éléments suivants
-    - Figure : La figure contenant tous les histogrammes
+    - Figure : La figure contenant tous les histogrammes (None si plot est faux)
     - Analysis : Le résultat de toutes les distributions
-    - Dataframe : Dataframe récapitulatif (trié et arrondi à 10e-5)
+    - Dataframe : Dataframe récapitulatif (trié par métriques ou par BIC, voir RANKINGS, et arrondi à 10e-5)
+    - Box-Cox : Résultat du test de Box-Cox (voir box_cox_test)
+    - Rows : Nombre de lignes sur lesquelles repose le résultat
+    - Final : Faux pour un résultat provisoire du mode progressif
     """
+    if isinstance(data, (str, os.PathLike)): data = load_data(os.fspath(data))
+    data = as_readonly(data, dtype)  # Vue partagée par toutes les analyses, aucune copie (sauf conversion de type)
     if len(data) == 0: raise ValueError("Empty array is not allowed.")
     if distributions is None: distributions = [Normal, Log, Exponential, Power]
+    if discrete is None: discrete = is_integer_data(data)
+    if discrete: distributions = list(distributions) + [d for d in DISCRETE_DISTRIBUTIONS if d not in distributions]
+    plot = plot and metrics
+    if progressive: return _check_progressive(data, distributions, low_memory, dtype, weights, plot, threads, callback, metrics, workers)
+
+    # Valeurs distinctes et effectifs communs aux familles discrètes, statistiques des données communes aux familles continues
+    is_discrete = [issubclass(d, _BaseDiscrete) for d in distributions]
+    support, counts = collapse(data, weights) if any(is_discrete) else (None, None)
+    prepared = None
+    if metrics and not all(is_discrete): prepared = data_statistics(data, weights, sorted_copy=not low_memory or workers > 1)
+    options = dict(dtype=dtype, threads=threads, metrics=metrics)
+    if workers > 1:
+        analysis = _analyze_in_processes(data, weights, support, counts, prepared, distributions, workers, options)
+        fig = _plot_analysis(analysis, low_memory) if plot else None
+    else:
+        fig, axes = _make_figure(len(distributions)) if plot else (None, [None] * len(distributions))
+        analysis = []
+        for i in range(len(distributions)):
+            if is_discrete[i]: analysis.append(distributions[i](support, axes[i], low_memory=low_memory, weights=counts, **options))
+            else: analysis.append(distributions[i](data, axes[i], low_memory=low_memory, weights=weights, prepared=prepared, **options))
+
+    # Familles discrètes et continues ensemble : leurs MSE ne sont pas comparables (fonction de masse d'un côté, KDE d'un tirage de l'autre),
+    # toutes sont classées par vraisemblance, celle des familles continues étant calculée sur des classes unitaires (voir discretize)
+    mixed = any(is_discrete) and not all(is_discrete)
+    if mixed:
+        for a, d in zip(analysis, is_discrete):
+            if not d: a.discretize(support, counts)
+    ranking = "metrics" if metrics and not mixed else "likelihood"
+    return {"Figure": fig, "Analysis": analysis, "Dataframe": combine_distributions(analysis, ranking), "Box-Cox": box_cox_test(data, weights),
+            "Rows": len(data), "Final": True}
+
+##################################################
+def data_statistics(data: np.ndarray, weights: np.ndarray = None, sorted_copy: bool = True):
+    """
+    Statistiques des données utilisées par get_results, identiques pour toutes les familles : calculées une seule fois par analyse
+    :param data: Distribution à analyser
+    :param weights: Poids ou effectifs de chaque valeur, None pour des données brutes
+    :param sorted_copy: Ajoute une copie triée des données (tests à deux échantillons sans nouveau tri, données brutes seulement)
+    :return: Dictionnaire de tableaux (partageables tels quels, voir libs.shared) : courbe KDE (X, Y), moments (skewness, kurtosis),
+    test de Shapiro-Wilk (statistique, p-value) et valeurs triées pour des données brutes
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # Désactiver temporairement l'affichage des avertissements
+        res = {"KDE": np.array(get_kde(data, weights=weights)), "Moments": np.array(get_moments(data, weights))}
+        if weights is None:
+            res["Shapiro"] = np.array(tuple(stats.shapiro(data)))
+            if sorted_copy: res["Sorted"] = np.sort(data)
+    return res
+
+##################################################
+def _analyze_shared(handle: dict, cls, data_key: str, weights_key: str, prepared_prefix: str, options: dict):
+    """
+    Ajuste une famille dans un processus de calcul à partir de tableaux en mémoire partagée (voir _analyze_in_processes)
+    :param handle: Descripteur des tableaux partagés (voir libs.shared.SharedArrays)
+    :param cls: Classe de la distribution
+    :param data_key: Nom du tableau des données
+    :param weights_key: Nom du tableau des poids (None pour des données brutes)
+    :param prepared_prefix: Préfixe des statistiques des données (voir data_statistics), None pour les calculer
+    :param options: Options de la distribution (dtype, threads, metrics)
+    :return: L'analyse, sans les données ni la distribution générée (seuls les paramètres et les résultats reviennent au processus principal)
+    """
+    from libs.shared import attach, detach
+    try:
+        analysis = _fit_attached(attach(handle), cls, data_key, weights_key, prepared_prefix, options)
+    finally: detach(handle)  # Les vues sont libérées à la sortie de _fit_attached
+    return analysis
+
+##################################################
+def _fit_attached(arrays: dict, cls, data_key: str, weights_key: str, prepared_prefix: str, options: dict):
+    """ Ajustement sur les vues partagées (voir _analyze_shared), les références aux vues sont retirées de l'analyse renvoyée """
+    prepared = None
+    if prepared_prefix is not None:
+        prepared = {k[len(prepared_prefix):]: v for k, v in arrays.items() if k.startswith(prepared_prefix)}
+    analysis = cls(arrays[data_key], None, low_memory=True, weights=arrays.get(weights_key), prepared=prepared, **options)
+    analysis.data, analysis.weights, analysis.prepared = None, None, None
+    return analysis
+
+##################################################
+def _run_shared(arrays: dict, jobs: list, workers: int, options: dict):
+    """
+    Exécute des ajustements dans des processus, les tableaux étant placés une seule fois en mémoire partagée.
+    Les segments sont supprimés quelle que soit l'issue (succès, erreur, interruption) et les tâches en attente sont annulées en cas d'échec.
+    :param arrays: Dictionnaire nom -> tableau à partager
+    :param jobs: Liste de (classe, nom des données, nom des poids, préfixe des statistiques)
+    :param workers: Nombre de processus
+    :param options: Options des distributions
+    :return: Liste des analyses (dans l'ordre des tâches, sans données)
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context
+    from libs.shared import SharedArrays
+    with SharedArrays({k: v for k, v in arrays.items() if v is not None}) as shared:
+        pool = ProcessPoolExecutor(min(workers, len(jobs)), mp_context=get_context("spawn"))
+        done = False
+        try:
+            futures = [pool.submit(_analyze_shared, shared.handle, *job, options) for job in jobs]
+            analysis = [f.result() for f in futures]
+            done = True
+        finally: pool.shutdown(wait=done, cancel_futures=True)
+    return analysis
+
+##################################################
+def _analyze_in_processes(data: np.ndarray, weights, support, counts, prepared, distributions: list, workers: int, options: dict):
+    """
+    Ajuste chaque famille dans un processus (voir check_distributions et _run_shared)
+    :return: Liste des analyses, les données (vues du processus principal) y sont rattachées
+    """
+    arrays = {"Data": data, "Weights": weights, "Support": support, "Counts": counts}
+    arrays.update({f"Prepared/{k}": v for k, v in (prepared or {}).items()})
+    jobs = [(d, "Support", "Counts", None) if issubclass(d, _BaseDiscrete) else (d, "Data", None if weights is None else "Weights", "Prepared/")
+            for d in distributions]
+    analysis = _run_shared(arrays, jobs, workers, options)
+    for a in analysis:
+        if isinstance(a, _BaseDiscrete): a._set_data(support, counts)
+        else: a._set_data(data, weights)
+    return analysis
+
+##################################################
+def _plot_analysis(analysis: list, low_memory: bool):
+    """
+    Dessine la figure des histogrammes d'analyses déjà calculées
+    Une distribution générée déjà libérée (low_memory, processus de calcul) est remplacée par un nouveau tirage du même modèle.
+    :param analysis: Liste des analyses
+    :param low_memory: Libère les distributions générées après le dessin
+    :return: La figure
+    """
+    fig, axes = _make_figure(len(analysis))
+    for a, ax in zip(analysis, axes):
+        if a.data_gen is None and not isinstance(a, _BaseDiscrete): a._make_distribution()
+        a.plot(ax)
+        if low_memory: a.release()
+    return fig
 
-    n_dist = len(distributions)
+##################################################
+def _make_figure(n_dist: int):
+    """
+    Crée la figure des histogrammes
+    :param n_dist: Nombre de distributions
+    :return: La figure et la liste de ses axes
+    """
+    import matplotlib.pyplot as plt
     rows = round(math.sqrt(n_dist))         # Arrondir au lieu d'un cast en int car ça évite trop de différence entre le nombre de lignes et colonnes
     columns = (n_dist + rows - 1) // rows   # Arrondir vers le haut
-
     fig, axes = plt.subplots(rows, columns, figsize=(16, 10), dpi=200)
-    axes = axes.ravel()
-    analysis = []
-    for i in range(n_dist):
-        analysis.append(distributions[i](data, axes[i]))
+    return fig, np.ravel(axes)
 
-    return {"Figure": fig, "Analysis": analysis, "Dataframe": combine_distributions(analysis), "Box-Cox": box_cox_test(data)}
+##################################################
+def _check_progressive(data: np.ndarray, distributions: list, low_memory: bool, dtype, weights, plot: bool, threads: int, callback,
+                       metrics: bool = True, workers: int = 1):
+    """
+    Mode progressif de check_distributions : chaque étape analyse les premières valeurs d'une permutation fixe des données
+    (sous-échantillons emboîtés), la dernière étape possible étant l'ensemble des données
+    :return: Le résultat de la dernière étape (voir check_distributions), la figure n'est dessinée qu'à la fin
+    """
+    n = len(data)
+    sizes = [PROGRESSIVE_START]
+    while sizes[-1] < n: sizes.append(sizes[-1] * PROGRESSIVE_FACTOR)
+    sizes = sizes[:-1] + [n]
+    order = np.random.default_rng(0).permutation(n) if len(sizes) > 1 else None
+    previous = None
+    for m in sizes:
+        idx = np.sort(order[:m]) if m < n else slice(None)  # Indices triés : lecture séquentielle des données
+        result = check_distributions(data[idx], distributions, low_memory=low_memory and not plot, dtype=dtype, discrete=False, plot=False, threads=threads,
+                                     metrics=metrics, workers=workers,
+                                     weights=None if weights is None else np.asarray(weights)[idx])
+        result["Final"] = m == n or (previous is not None and _is_stable(previous["Dataframe"], result["Dataframe"]))
+        if callback is not None: callback(result)
+        if result["Final"]: break
+        previous = result
+
+    if plot: result["Figure"] = _plot_analysis(result["Analysis"], low_memory)
+    elif low_memory:
+        for analysis in result["Analysis"]: analysis.release()
+    return result
 
 ##################################################
-def combine_distributions(distributions: list):
+def _is_stable(previous, current):
+    """
+    Compare les classements de deux étapes du mode progressif
+    :param previous: Dataframe de l'étape précédente
+    :param current: Dataframe de l'étape courante
+    :return: Vrai si les PROGRESSIVE_TOP_K premières familles sont dans le même ordre avec une statistique de KS proche
+    (seul l'ordre compte si les métriques ne sont pas calculées)
+    """
+    previous, current = previous.head(PROGRESSIVE_TOP_K), current.head(PROGRESSIVE_TOP_K)
+    if list(previous["Distribution"]) != list(current["Distribution"]): return False
+    ks = "Kolmogorov-Smirnov Test"
+    return not np.any(np.fabs(current[ks].to_numpy(dtype=float) - previous[ks].to_numpy(dtype=float)) > PROGRESSIVE_TOLERANCE)
+
+##################################################
+def combine_distributions(distributions: list, ranking: str = "metrics"):
     """
     Combine les différentes analyses de distributions en un seul dataframe
     :param distributions: liste des analyses
+    :param ranking: Ordre du tableau (voir RANKINGS) : "metrics" pour les métriques KDE, "likelihood" pour le BIC puis l'AIC
     :return: Dataframe contenant les informations calculées lors de l'analyse.
-    Les éléments sont triés par MSE puis kurtosis et skewness en cas d'égalité et arrondi à 10e-5 pour faciliter la lecture.
+    Les éléments sont triés par MSE puis kurtosis et skewness en cas d'égalité (ou par BIC) et arrondi à 10e-5 pour faciliter la lecture.
     """
+    import pandas as pd
     if len(distributions) == 0: raise ValueError("Empty list is not allowed.")
     res = []
     columns = ["Distribution", "Parameters", "MSE", "MSE Scale", "MSE Curve", "Delta Kurtosis", "Delta Skewness",
                "Kolmogorov-Smirnov Test", "Shapiro-Wilk Test", "Wasserstein Distance",
                "Pearson Correlation Test on values", "Pearson Correlation Test on KDE",
-               "Anderson-Darling Test on values", "Anderson-Darling Test on KDE"]
+               "Anderson-Darling Test on values", "Anderson-Darling Test on KDE", "Log-Likelihood", "AIC", "BIC"]
+    if ranking not in RANKINGS: raise ValueError(f"Unknown ranking {ranking}, expected one of {list(RANKINGS)}.")
     for d in distributions: res.append(get_values(d, d.type, columns))
-    return pd.DataFrame(res, columns=columns).sort_values(by=["MSE", "MSE Scale", "MSE Curve", "Delta Kurtosis", "Delta Skewness"]).round(5)
+    return pd.DataFrame(res, columns=columns).sort_values(by=RANKINGS[ranking], kind="stable").round(5)
 
 ##################################################
-def check_normality(distributions: dict):
+def check_normality(distributions: dict, workers: int = 1):
     """
     Calcule pour chacune des distributions sa proximité avec une distribution normale
     :param distributions: liste des dsitributions (normalement plusieurs transformations d'une distribution d'origine)
+    :param workers: Nombre de processus (une transformation par tâche, tableaux en mémoire partagée, voir check_distributions)
     :return: Dictionnaire contenant les informations calculées lors de l'analyse.
     """
     if len(distributions) == 0: raise ValueError("Empty dictionnary is not allowed.")
@@ -105,12 +326,21 @@ def check_normality(distributions: dict):
     rows = round(math.sqrt(n_dist))  # Arrondir au lieu d'un cast en int car ça évite trop de différence entre le nombre de lignes et colonnes
     columns = (n_dist + rows - 1) // rows  # Arrondir vers le haut
 
+    import matplotlib.pyplot as plt
+    import pandas as pd
     fig, axes = plt.subplots(rows, columns, figsize=(16, 10), dpi=200)
     axes = axes.ravel()
+    if workers > 1:
+        # Chaque tableau n'est analysé qu'une fois : partagé sans statistiques précalculées
+        fitted = _run_shared(valid_distributions, [(Normal, name, None, None) for name in valid_distributions], workers, {})
+        for normal_analysis, ax, array in zip(fitted, axes, valid_distributions.values()):
+            normal_analysis._set_data(array)
+            normal_analysis._make_distribution()
+            normal_analysis.plot(ax)
     analysis = []
     i = 0
     for name, array in valid_distributions.items():
-        normal_analysis = Normal(array, axes[i])
+        normal_analysis = fitted[i] if workers > 1 else Normal(array, axes[i])
         axes[i].set_title(f"{name} transformation (MSE: {np.round(normal_analysis.results['MSE Curve'], 3)})")
         table.append(get_values(normal_analysis, name, cols_name))
         analysis.append(normal_analysis)
@@ -127,15 +357,37 @@ def check_normality(distributions: dict):
 # region Base Distribution Class
 # ==================================================
 class _BaseDistribution(ABC):
-    """ Classe mère des distributions """
+    """
+    Classe mère des distributions
+    Les classes filles doivent déclarer __slots__ = () (ou leurs propres attributs) pour ne pas recréer de __dict__ par instance.
+    """
+    __slots__ = ("type", "data", "data_gen", "weights", "params", "results", "low_memory", "dtype", "threads", "metrics", "log_likelihood",
+                 "prepared")
+
+    # Taille minimale de la distribution générée pour des données pondérées (un histogramme de quelques classes donnerait un échantillon trop bruité)
+    WEIGHTED_SAMPLE_SIZE = 10000
 
     ##################################################
-    def __init__(self, data: np.ndarray = None, ax: plt.axes = None):
+    def __init__(self, data: np.ndarray = None, ax: "plt.axes" = None, low_memory: bool = False, dtype=None, weights: np.ndarray = None,
+                 threads: int = 1, metrics: bool = True, prepared: dict = None):
+        """
+        :param data: Distribution à analyser (None pour ne pas lancer l'analyse)
+        :param ax: Axe sur lequel dessiner nos histogrammes
+        :param low_memory: Si vrai, la distribution générée est libérée dès que les métriques (et le dessin) sont calculés
+        :param dtype: Type de stockage des données et de la distribution générée (np.float32 par exemple), None conserve le type d'origine
+        :param weights: Poids ou effectifs de chaque valeur (voir fit)
+        :param threads: Nombre de threads pour calculer les métriques indépendantes en parallèle (1 pour un calcul séquentiel)
+        :param metrics: Si faux, seuls la log-vraisemblance, l'AIC et le BIC sont calculés (aucune distribution générée ni KDE, pas de dessin)
+        :param prepared: Statistiques des données déjà calculées (voir data_statistics), communes à toutes les familles, None pour les calculer
+        (utilisées par le premier calcul des métriques puis libérées)
+        """
         self.type = self._get_type()
-        self.data, self.data_gen = None, None
+        self.data, self.data_gen, self.weights = None, None, None
         self.params = dict()
         self.results = dict()
-        if data is not None: self.fit(data, ax)
+        self.low_memory, self.dtype, self.threads, self.metrics = low_memory, dtype, threads, metrics
+        self.log_likelihood, self.prepared = None, prepared
+        if data is not None: self.fit(data, ax, weights)
 
     ##################################################
     @staticmethod
@@ -147,32 +399,205 @@ class _BaseDistribution(ABC):
                                f"Results : \n{self.print_result()}")
 
     ##################################################
-    def fit(self, data: np.ndarray, ax=None):
+    def fit(self, data: np.ndarray, ax=None, weights: np.ndarray = None):
         """
         Ajoute un tableau de nombre à la classe qui sera la distribution à analyser
         :param ax: Axe sur lequel dessiner nos histogrammes
+        :param data: Tableau des nombres à ajouter (conservé sous forme de vue en lecture seule, sans copie)
+        :param weights: Poids ou effectifs de chaque valeur (histogramme agrégé), None pour des données brutes.
+        Avec des poids, l'ajustement et les métriques sont calculés sur les valeurs distinctes : le coût dépend du nombre de classes.
+        """
+        self._set_data(data, weights)
+        self.log_likelihood = None
+        self._find_parameters()  # Enregistre la log-vraisemblance maximisée si l'ajustement la calcule
+        if self.log_likelihood is None: self.log_likelihood = self._log_likelihood()
+        self._assess(ax)
+
+    ##################################################
+    def evaluate(self, data: np.ndarray, params: dict, ax=None, weights: np.ndarray = None):
+        """
+        Calcule les métriques pour des paramètres déjà connus, sans ajustement (voir fit pour les arguments)
+        :param data: Tableau des nombres à comparer
+        :param params: Paramètres de la distribution (mêmes clés que self.params après un fit)
+        :param ax: Axe sur lequel dessiner nos histogrammes
+        :param weights: Poids ou effectifs de chaque valeur, None pour des données brutes
+        """
+        self._set_data(data, weights)
+        self.params = dict(params)
+        self.log_likelihood = self._log_likelihood()
+        self._assess(ax)
+
+    ##################################################
+    def _set_data(self, data: np.ndarray, weights: np.ndarray = None):
+        """
+        Vérifie et enregistre les données (et leurs poids)
         :param data: Tableau des nombres à ajouter
+        :param weights: Poids ou effectifs de chaque valeur, None pour des données brutes
+        """
+        if weights is not None:
+            if len(weights) != len(data): raise ValueError("Weights and data must have the same length.")
+            if np.any(np.asarray(weights) < 0): raise ValueError("Negative weights are not allowed.")
+            self.weights = as_readonly(weights, np.float64)
+            if np.sum(self.weights) < 10: raise ValueError("Distribution must have at least 10 values.")
+        elif len(data) < 10: raise ValueError("Distribution must have at least 10 values.")
+        self.data = as_readonly(data, self.dtype)
+
+    ##################################################
+    def _assess(self, ax=None):
+        """
+        Génère la distribution à partir des paramètres, calcule les métriques et dessine les histogrammes
+        Sans métriques (metrics faux), seuls les critères de vraisemblance sont calculés.
+        :param ax: Axe sur lequel dessiner nos histogrammes (None pour ne pas dessiner)
+        """
+        if self.metrics:
+            self._make_distribution()
+            if self.dtype is not None and self.data_gen is not None: self.data_gen = self.data_gen.astype(self.dtype, copy=False)
+            self.get_results()
+            self.prepared = None  # Statistiques des données (dont leur copie triée) : servent une seule fois, ne pas les conserver
+            if ax is not None:
+                self.plot(ax)
+        self._set_criteria()
+        if self.low_memory: self.release()
+
+    ##################################################
+    def _set_criteria(self):
+        """ Enregistre la log-vraisemblance (self.log_likelihood), l'AIC et le BIC dans les résultats """
+        n, k = self._n_observations(), self._n_params()
+        if np.isfinite(self.log_likelihood):
+            self.results["Log-Likelihood"] = self.log_likelihood
+            self.results["AIC"] = 2 * k - 2 * self.log_likelihood
+            self.results["BIC"] = k * np.log(n) - 2 * self.log_likelihood
+        else:
+            # Ajustement invalide : données hors du support (-inf) ou vraisemblance non bornée (+inf, densité infinie sur une valeur)
+            self.results["Log-Likelihood"] = np.nan
+            self.results["AIC"] = self.results["BIC"] = np.inf  # Classé en dernier par vraisemblance
+
+    ##################################################
+    def discretize(self, support: np.ndarray, counts: np.ndarray):
+        """
+        Remplace la log-vraisemblance (et l'AIC, le BIC) par celle des données entières regroupées en classes unitaires :
+        chaque valeur x a la probabilité P(x - 0.5 < X <= x + 0.5) du modèle ajusté. Elle se compare alors à celle d'une famille discrète
+        (une densité évaluée sur des entiers ne se compare pas à une fonction de masse).
+        :param support: Valeurs entières distinctes (voir collapse)
+        :param counts: Effectif de chaque valeur
+        """
+        frozen = self._frozen()
+        used = counts > 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            prob = frozen.cdf(support[used] + 0.5) - frozen.cdf(support[used] - 0.5)
+            self.log_likelihood = np.sum(counts[used] * np.log(prob))
+        self._set_criteria()
+
+    ##################################################
+    def release(self):
+        """ Libère la distribution générée (les paramètres et résultats sont conservés, plot n'est plus possible) """
+        self.data_gen = None
+
+    ##################################################
+    def _sample_size(self):
+        """
+        Taille de la distribution générée
+        :return: Le nombre de valeurs pour des données brutes, sinon le nombre de classes (au moins WEIGHTED_SAMPLE_SIZE, au plus l'effectif total)
+        """
+        if self.weights is None: return len(self.data)
+        return int(min(np.sum(self.weights), max(len(self.data), self.WEIGHTED_SAMPLE_SIZE)))
+
+    ##################################################
+    def _n_observations(self):
+        """
+        Nombre d'observations (pour le BIC)
+        :return: Le nombre de valeurs, ou l'effectif total pour des données pondérées
+        """
+        return len(self.data) if self.weights is None else np.sum(self.weights)
+
+    ##################################################
+    def _n_params(self):
+        """
+        Nombre de paramètres libres (pour l'AIC et le BIC)
+        :return: Le nombre de paramètres
+        """
+        return len(self.params)
+
+    ##################################################
+    def _log_likelihood(self):
+        """
+        Log-vraisemblance des données pour les paramètres actuels (utilisée quand l'ajustement ne la fournit pas, voir fit)
+        :return: Σ w log(pdf)
+        """
+        return -self._neg_log_likelihood(self._frozen().pdf(self.data))
+
+    ##################################################
+    def _minimize(self, x0: np.ndarray):
+        """
+        Minimise la log-vraisemblance négative (_cost) par Nelder-Mead.
+        Un coût non fini (-inf pour une densité infinie sur une valeur, NaN) est traité comme +inf : l'optimiseur ne s'y arrête pas.
+        Les paramètres sont ensuite réécrits au point optimal (et non au dernier point évalué) et la log-vraisemblance maximisée est conservée.
+        :param x0: Point de départ
+        """
+        def cost(params):
+            value = self._cost(params)
+            return value if np.isfinite(value) else np.inf
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # Désactiver temporairement l'affichage des avertissements
+            res = minimize(cost, x0, method='Nelder-Mead')
+            self.log_likelihood = -self._cost(res.x)
+
+    ##################################################
+    def _neg_log_likelihood(self, pdf: np.ndarray):
+        """
+        Log-vraisemblance négative (pondérée par les effectifs si besoin)
+        Les classes vides (poids nul) sont ignorées : elles ne contribuent pas, même là où la densité est nulle (0 * log(0)).
+        Une densité nulle sur une donnée donne +inf sans avertissement (ajustement invalide, voir _set_criteria).
+        :param pdf: Densité du modèle évaluée sur les données
+        :return: -Σ w log(pdf)
         """
-        if len(data) < 10: raise ValueError("Distribution must have at least 10 values.")
-        self.data = data.copy()
-        self._find_parameters()
-        self._make_distribution()
-        self.get_results()
-        if ax is not None:
-            self.plot(ax)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if self.weights is None: return -np.sum(np.log(pdf))
+            used = self.weights > 0
+            return -np.sum(self.weights[used] * np.log(pdf[used]))
 
     ##################################################
-    def plot(self, ax: plt.axes):
+    def plot(self, ax: "plt.axes"):
         """
         Dessine les distributions originales et généré
         :param ax: Axe
         """
-        sns.histplot(self.data, kde=True, ax=ax)
+        import seaborn as sns
+        bins = "auto" if self.weights is None else min(len(self.data), 100)  # seaborn ne calcule pas de classes automatiques avec des poids
+        sns.histplot(x=self.data, weights=self.weights, bins=bins, kde=True, ax=ax)
         sns.histplot(self.data_gen, kde=True, ax=ax)
         ax.set_title(f"{self.type} Distribution (MSE: {np.round(self.results['MSE'], 3)})")
         ax.legend(["data", f"{self.type} Distribution"], title="Distribution")
         ax.set_xlabel("Values")
 
+    ##################################################
+    @abstractmethod
+    def _frozen(self):
+        """
+        Distribution scipy correspondant aux paramètres actuels (utilisée pour les tables des modèles, voir to_model)
+        :return: Distribution scipy "gelée" (frozen) ou objet ayant la même interface
+        """
+        pass
+
+    ##################################################
+    def to_model(self, grid_size: int = 2001):
+        """
+        Réduit la distribution ajustée à un modèle sérialisable avec une table de répartition précalculée
+        :param grid_size: Nombre de points de la table (familles continues)
+        :return: Le modèle (voir libs.models.FittedModel)
+        """
+        if not self.params: raise ValueError("Distribution must be fitted before building a model.")
+        return FittedModel.from_frozen(self.type, self.params, self._frozen(), isinstance(self, _BaseDiscrete), grid_size)
+
+    ##################################################
+    def save(self, path: str):
+        """
+        Enregistre le modèle ajusté (voir to_model et libs.models.load_model pour le recharger)
+        :param path: Chemin du fichier (.npz)
+        """
+        self.to_model().save(path)
+
+    ##################################################
     @abstractmethod
     def _cost(self, params: np.ndarray):
         """
@@ -196,36 +621,61 @@ class _BaseDistribution(ABC):
 
     ##################################################
     def get_results(self):
-        """ Calcule différentes métriques de comparaison de distributions """
+        """
+        Calcule différentes métriques de comparaison de distributions
+        Avec des données pondérées, les tests sans version pondérée (Shapiro-Wilk, Pearson et Anderson-Darling sur les valeurs) valent NaN.
+        """
         with warnings.catch_warnings():
             warnings.simplefilter("ignore")  # Désactiver temporairement l'affichage des avertissements
             """ Calcule la différence entre la distribution stockée et la distribution générée """
-            kde, kde_gen = get_kde(self.data), get_kde(self.data_gen)  # Récupération des courbes
+            data, gen, weights = self.data, self.data_gen, self.weights
+            raw = weights is None
+            # Calculs indépendants (éventuellement en parallèle, voir run_tasks), les tests sur les KDE attendent les deux courbes
+            # KS et Anderson-Darling sur les valeurs, Wasserstein et Anderson-Darling sur les KDE : un tri et une fusion par couple
+            # Les statistiques des données déjà calculées (voir data_statistics) sont reprises telles quelles
+            prepared = self.prepared if self.prepared is not None else {}
+            def cached(key, func): return partial(prepared.get, key) if key in prepared else func
+            if not raw: test = partial(get_ks, data, gen, weights)
+            elif "Sorted" in prepared: test = lambda: two_sample_tests(prepared["Sorted"], np.sort(gen), presorted=True)
+            else: test = partial(two_sample_tests, data, gen)
+            tasks = {"KDE": (cached("KDE", partial(get_kde, data, weights=weights)), []),
+                     "KDE Gen": (partial(get_kde, gen), []),
+                     "Moments": (cached("Moments", partial(get_moments, data, weights)), []),
+                     "Moments Gen": (partial(get_moments, gen), []),
+                     "Tests": (test, []),
+                     "KDE Tests": (lambda kde, kde_gen: two_sample_tests(kde[1], kde_gen[1]), ["KDE", "KDE Gen"]),
+                     "Pearson KDE": (lambda kde, kde_gen: stats.pearsonr(kde[1], kde_gen[1]), ["KDE", "KDE Gen"])}
+            if raw:
+                tasks.update({"Shapiro": (cached("Shapiro", partial(stats.shapiro, data)), []), "Shapiro Gen": (partial(stats.shapiro, gen), []),
+                              "Pearson": (partial(stats.pearsonr, data, gen), [])})
+            r = run_tasks(tasks, self.threads)
+            kde, kde_gen, tests, kde_tests = r["KDE"], r["KDE Gen"], r["Tests"], r["KDE Tests"]
             # Basic Tests
-            self.results["MSE"] = get_kde_mse(self.data, self.data_gen, 1)
-            self.results["MSE Scale"] = get_kde_mse(self.data, self.data_gen, 0)
-            self.results["MSE Curve"] = get_kde_curve_mse(self.data, self.data_gen)
-            self.results["Delta Kurtosis"] = np.fabs(stats.kurtosis(self.data) - stats.kurtosis(self.data_gen))
-            self.results["Delta Skewness"] = np.fabs(stats.skew(self.data) - stats.skew(self.data_gen))
+            self.results["MSE"] = get_curve_mse(kde, kde_gen, 1)
+            self.results["MSE Scale"] = get_curve_mse(kde, kde_gen, 0)
+            self.results["MSE Curve"] = get_curve_mse(kde, kde_gen)
+            (skew, kurtosis), (skew_gen, kurtosis_gen) = r["Moments"], r["Moments Gen"]
+            self.results["Delta Kurtosis"] = np.fabs(kurtosis - kurtosis_gen)
+            self.results["Delta Skewness"] = np.fabs(skew - skew_gen)
             # Kolmogorov-Smirnov (KS) Test
-            ks = np.round(stats.kstest(self.data, self.data_gen), 3)
+            ks = np.round((tests["KS Statistic"], tests["KS P-Value"]) if raw else tests, 3)
             self.results["Kolmogorov-Smirnov Test"] = dict(P=ks[0], S=ks[1])
             # Shapiro-Wilk Test
-            s, p = stats.shapiro(self.data)
-            s_gen, p_gen = stats.shapiro(self.data_gen)
-            self.results["Shapiro-Wilk Test"] = dict(P=np.fabs(p - p_gen), S=np.fabs(s - s_gen))
+            if raw:
+                (s, p), (s_gen, p_gen) = r["Shapiro"], r["Shapiro Gen"]
+                self.results["Shapiro-Wilk Test"] = dict(P=np.fabs(p - p_gen), S=np.fabs(s - s_gen))
+            else: self.results["Shapiro-Wilk Test"] = dict(P=np.nan, S=np.nan)
             # Wasserstein Test
-            self.results["Wasserstein Distance"] = stats.wasserstein_distance(kde[1], kde_gen[1])
+            self.results["Wasserstein Distance"] = kde_tests["Wasserstein Distance"]
             # Pearson Correlation Test
-            s, p = stats.pearsonr(self.data, self.data_gen)
+            s, p = r["Pearson"] if raw else (np.nan, np.nan)
             self.results["Pearson Correlation Test on values"] = dict(P=p, S=s)
-            s, p = stats.pearsonr(kde[1], kde_gen[1])
+            s, p = r["Pearson KDE"]
             self.results["Pearson Correlation Test on KDE"] = dict(P=p, S=s)
             # Anderson-Darling Test
-            r = stats.anderson_ksamp([self.data, self.data_gen])
-            self.results["Anderson-Darling Test on values"] = dict(P=r.significance_level, S=r.statistic)
-            r = stats.anderson_ksamp([kde[1], kde_gen[1]])
-            self.results["Anderson-Darling Test on KDE"] = dict(P=r.significance_level, S=r.statistic)
+            if raw: self.results["Anderson-Darling Test on values"] = dict(P=tests["AD P-Value"], S=tests["AD Statistic"])
+            else: self.results["Anderson-Darling Test on values"] = dict(P=np.nan, S=np.nan)
+            self.results["Anderson-Darling Test on KDE"] = dict(P=kde_tests["AD P-Value"], S=kde_tests["AD Statistic"])
 
     ##################################################
     def print_result(self):
@@ -246,20 +696,31 @@ class _BaseDistribution(ABC):
 # region Normal Distribution Class
 # ==================================================
 class Normal(_BaseDistribution):
+    __slots__ = ()
+
     ##################################################
     @staticmethod
     def _get_type(): return "Normal"
 
     ##################################################
-    def _cost(self, params: np.ndarray): return 0.0
+    def _frozen(self): return stats.norm(self.params["Mu"], self.params["Sigma"])
+
+    ##################################################
+    def _cost(self, params: np.ndarray):
+        self.params["Mu"], self.params["Sigma"] = params
+        return self._neg_log_likelihood(self._frozen().pdf(self.data))
 
     ##################################################
     def _find_parameters(self):
-        self.params = dict(Mu=np.mean(self.data), Sigma=np.std(self.data))
+        # Estimateurs du maximum de vraisemblance en forme close
+        mu = np.average(self.data, weights=self.weights)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # Comme _minimize : une densité nulle (ou un écart-type nul) donne un ajustement invalide, sans avertissement
+            self.log_likelihood = -self._cost(np.array([mu, np.sqrt(np.average((self.data - mu) ** 2, weights=self.weights))]))
 
     ##################################################
     def _make_distribution(self):
-        self.data_gen = np.random.normal(self.params["Mu"], self.params["Sigma"], len(self.data))
+        self.data_gen = np.random.normal(self.params["Mu"], self.params["Sigma"], self._sample_size())
 
 # ==================================================
 # endregion Normal Distribution Class
@@ -269,27 +730,29 @@ class Normal(_BaseDistribution):
 # region Log Distribution Class
 # ==================================================
 class Log(_BaseDistribution):
+    __slots__ = ()
+
     ##################################################
     @staticmethod
     def _get_type(): return "Log"
 
+    ##################################################
+    def _frozen(self): return stats.lognorm(s=self.params["Shape"])
+
     ##################################################
     def _cost(self, params: np.ndarray):
         self.params["Shape"] = params[0]
         # self._make_distribution()
         # return get_kde_mse(self.data, self.data_gen)
-        return -np.sum(np.log(stats.lognorm(s=self.params["Shape"]).pdf(self.data)))
+        return self._neg_log_likelihood(self._frozen().pdf(self.data))
 
     ##################################################
     def _find_parameters(self):
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")  # Désactiver temporairement l'affichage des avertissements
-            minimize(self._cost, np.array([1.0, 1.0]), method='Nelder-Mead')
-        self._make_distribution()
+        self._minimize(np.array([1.0, 1.0]))
 
     ##################################################
     def _make_distribution(self):
-        self.data_gen = np.random.lognormal(self.params["Shape"], 1.0, len(self.data))
+        self.data_gen = np.random.lognormal(self.params["Shape"], 1.0, self._sample_size())
 
 # ==================================================
 # endregion Log Distribution Class
@@ -299,27 +762,29 @@ class Log(_BaseDistribution):
 # region Exponential Distribution Class
 # ==================================================
 class Exponential(_BaseDistribution):
+    __slots__ = ()
+
     ##################################################
     @staticmethod
     def _get_type(): return "Exponential"
 
+    ##################################################
+    def _frozen(self): return stats.expon(scale=self.params["Scale"])
+
     ##################################################
     def _cost(self, params: np.ndarray):
         self.params["Scale"] = params[0]
         # self._make_distribution()
         # return get_kde_mse(self.data, self.data_gen)
-        return -np.sum(np.log(stats.expon(scale=self.params["Scale"]).pdf(self.data)))
+        return self._neg_log_likelihood(self._frozen().pdf(self.data))
 
     ##################################################
     def _find_parameters(self):
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")  # Désactiver temporairement l'affichage des avertissements
-            minimize(self._cost, np.array([1.0]), method='Nelder-Mead')
-        self._make_distribution()
+        self._minimize(np.array([1.0]))
 
     ##################################################
     def _make_distribution(self):
-        self.data_gen = np.random.exponential(self.params["Scale"], len(self.data))
+        self.data_gen = np.random.exponential(self.params["Scale"], self._sample_size())
 
 # ==================================================
 # endregion Exponential Distribution Class
@@ -329,30 +794,32 @@ class Exponential(_BaseDistribution):
 # region Power Distribution Class
 # ==================================================
 class Power(_BaseDistribution):
+    __slots__ = ()
+
     ##################################################
     @staticmethod
     def _get_type(): return "Power"
 
+    ##################################################
+    def _frozen(self): return stats.powerlaw(self.params["Alpha"])
+
     ##################################################
     def _cost(self, params: np.ndarray):
         self.params["Alpha"] = params[0]
-        return -np.sum(np.log(stats.powerlaw(self.params["Alpha"]).pdf(self.data)))
+        return self._neg_log_likelihood(self._frozen().pdf(self.data))
 
     ##################################################
     def _find_parameters(self):
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")  # Désactiver temporairement l'affichage des avertissements
-            minimize(self._cost, np.array([1.0]), method='Nelder-Mead')
-        self._make_distribution()
+        self._minimize(np.array([1.0]))
 
     ##################################################
     def _make_distribution(self):
         if self.params["Alpha"] == 0:
-            self.data_gen = np.full(len(self.data), self.params["Alpha"])
+            self.data_gen = np.full(self._sample_size(), self.params["Alpha"])
         elif self.params["Alpha"] > 0:
-            self.data_gen = np.random.power(self.params["Alpha"], len(self.data))
+            self.data_gen = np.random.power(self.params["Alpha"], self._sample_size())
         else:
-            self.data_gen = 1 / np.random.power(-self.params["Alpha"], len(self.data))
+            self.data_gen = 1 / np.random.power(-self.params["Alpha"], self._sample_size())
 
 # ==================================================
 # endregion Power Distribution Class
@@ -362,26 +829,28 @@ class Power(_BaseDistribution):
 # region Beta Distribution Class
 # ==================================================
 class Beta(_BaseDistribution):
+    __slots__ = ()
+
     ##################################################
     @staticmethod
     def _get_type(): return "Beta"
 
+    ##################################################
+    def _frozen(self): return stats.beta(self.params["A"], self.params["B"])
+
     ##################################################
     def _cost(self, params: np.ndarray):
         self.params["A"] = params[0]
         self.params["B"] = params[1]
-        return -np.sum(np.log(stats.beta(self.params["A"], self.params["B"]).pdf(self.data)))
+        return self._neg_log_likelihood(self._frozen().pdf(self.data))
 
     ##################################################
     def _find_parameters(self):
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")  # Désactiver temporairement l'affichage des avertissements
-            minimize(self._cost, np.array([1.0, 1.0]), method='Nelder-Mead')
-        self._make_distribution()
+        self._minimize(np.array([1.0, 1.0]))
 
     ##################################################
     def _make_distribution(self):
-        self.data_gen = np.random.beta(self.params["A"], self.params["B"], len(self.data))
+        self.data_gen = np.random.beta(self.params["A"], self.params["B"], self._sample_size())
 
 # ==================================================
 # endregion Beta Distribution Class
@@ -391,30 +860,311 @@ class Beta(_BaseDistribution):
 # region Gamma Distribution Class
 # ==================================================
 class Gamma(_BaseDistribution):
+    __slots__ = ()
+
     ##################################################
     @staticmethod
     def _get_type(): return "Gamma"
 
+    ##################################################
+    def _frozen(self): return stats.gamma(self.params["Shape"])
+
     ##################################################
     def _cost(self, params: np.ndarray):
         self.params["Shape"] = params[0]
-        return -np.sum(np.log(stats.gamma(self.params["Shape"]).pdf(self.data)))
+        return self._neg_log_likelihood(self._frozen().pdf(self.data))
 
     ##################################################
     def _find_parameters(self):
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")  # Désactiver temporairement l'affichage des avertissements
-            minimize(self._cost, np.array([1.0]), method='Nelder-Mead')
-        self._make_distribution()
+        self._minimize(np.array([1.0]))
 
     ##################################################
     def _make_distribution(self):
-        self.data_gen = np.random.gamma(self.params["Shape"], 1.0, len(self.data))
+        self.data_gen = np.random.gamma(self.params["Shape"], 1.0, self._sample_size())
 
 # ==================================================
 # endregion Gamma Distribution Class
 # ==================================================
 
+# ==================================================
+# region Mixture Distribution Classes
+# ==================================================
+class _BaseMixture(_BaseDistribution):
+    """
+    Classe mère des mélanges finis (ajustés par EM vectorisé, voir libs.mixtures)
+    Le nombre de composantes K est choisi automatiquement par le critère BIC.
+    """
+    __slots__ = ()
+    FAMILY = "Normal"
+    PARAM_NAMES = ("Mu", "Sigma")  # Noms des positions et échelles des composantes
+    K_MAX = 4                      # Nombre maximal de composantes testées
+
+    ##################################################
+    def _fit_data(self):
+        """
+        Données utilisées par l'EM : les familles positives (Log, Gamma) ne sont ajustées que sur les valeurs strictement positives.
+        Les données ne sont pas modifiées : comme pour les lois Log et Gamma, la vraisemblance de toutes les données vaut alors -inf
+        (ajustement invalide, classé en dernier), les paramètres ne servant qu'aux métriques et au dessin.
+        :return: Le couple (valeurs, poids)
+        """
+        if self.FAMILY == "Normal" or np.all(self.data > 0): return self.data, self.weights
+        used = self.data > 0
+        if not np.any(used): used = self.data != 0  # Aucune valeur positive : ajustement sur les valeurs absolues
+        return np.fabs(self.data[used]), None if self.weights is None else self.weights[used]
+
+    ##################################################
+    def _frozen(self):
+        return MixtureDistribution(self.FAMILY, self.params["Weights"], self.params[self.PARAM_NAMES[0]], self.params[self.PARAM_NAMES[1]])
+
+    ##################################################
+    def _cost(self, params: np.ndarray):
+        k = len(params) // 3
+        return self._neg_log_likelihood(MixtureDistribution(self.FAMILY, params[:k], params[k:2 * k], params[2 * k:]).pdf(self.data))
+
+    ##################################################
+    def _n_params(self): return 3 * self.params["K"] - 1  # Poids (la somme vaut 1), positions et échelles
+
+    ##################################################
+    def _find_parameters(self):
+        values, weights = self._fit_data()
+        res = select_mixture(values, self.FAMILY, weights, self.K_MAX)
+        self.params = {"K": res["K"], "Weights": res["Weights"], self.PARAM_NAMES[0]: res["Loc"], self.PARAM_NAMES[1]: res["Scale"]}
+
+    ##################################################
+    def _make_distribution(self):
+        self.data_gen = sample_mixture(self.FAMILY, self.params["Weights"], self.params[self.PARAM_NAMES[0]],
+                                       self.params[self.PARAM_NAMES[1]], self._sample_size())
+
+##################################################
+class NormalMixture(_BaseMixture):
+    __slots__ = ()
+
+    ##################################################
+    @staticmethod
+    def _get_type(): return "Normal Mixture"
+
+##################################################
+class LogMixture(_BaseMixture):
+    __slots__ = ()
+    FAMILY = "Log"
+
+    ##################################################
+    @staticmethod
+    def _get_type(): return "Log Mixture"
+
+##################################################
+class GammaMixture(_BaseMixture):
+    __slots__ = ()
+    FAMILY = "Gamma"
+    PARAM_NAMES = ("Shape", "Scale")
+
+    ##################################################
+    @staticmethod
+    def _get_type(): return "Gamma Mixture"
+
+# ==================================================
+# endregion Mixture Distribution Classes
+# ==================================================
+
+# ==================================================
+# region Discrete Distribution Classes
+# ==================================================
+class _BaseDiscrete(_BaseDistribution):
+    """
+    Classe mère des distributions discrètes (données de comptage, entiers positifs ou nuls)
+    Les données sont regroupées une seule fois en valeurs distinctes (self.data) et effectifs (self.weights) :
+    la vraisemblance et les métriques sont calculées sur les valeurs distinctes, pas sur chaque valeur.
+    Les métriques KDE sont remplacées par la comparaison des fonctions de masse (PMF) empirique et théorique,
+    aucune distribution n'est générée (data_gen reste vide).
+    """
+    __slots__ = ("pmf",)
+
+    ##################################################
+    def _set_data(self, data: np.ndarray, weights: np.ndarray = None):
+        if not is_integer_data(data): raise ValueError(f"{self.type} distribution needs non-negative integer values.")
+        support, counts = collapse(data, weights)
+        super()._set_data(support, counts)
+
+    ##################################################
+    def _mean_var(self):
+        """
+        Moyenne et variance des données
+        :return: Le couple (moyenne, variance)
+        """
+        mean = np.average(self.data, weights=self.weights)
+        return mean, np.average((self.data - mean) ** 2, weights=self.weights)
+
+    ##################################################
+    def _log_likelihood(self): return -self._neg_log_likelihood(self._frozen().pmf(self.data))
+
+    ##################################################
+    def _make_distribution(self):
+        self.pmf = self._frozen().pmf(self.data)
+
+    ##################################################
+    def plot(self, ax: "plt.axes"):
+        """
+        Dessine les fonctions de masse empirique et théorique
+        :param ax: Axe
+        """
+        ax.bar(self.data, self.weights / np.sum(self.weights), alpha=0.6)
+        ax.plot(self.data, self.pmf, "o-", color="tab:orange")
+        ax.set_title(f"{self.type} Distribution (MSE: {np.round(self.results['MSE'], 3)})")
+        ax.legend(["data", f"{self.type} Distribution"], title="Distribution")
+        ax.set_xlabel("Values")
+
+    ##################################################
+    def get_results(self):
+        """
+        Calcule différentes métriques de comparaison entre les fonctions de masse empirique et théorique
+        Les colonnes "on KDE" portent sur les fonctions de masse, les tests sur les valeurs brutes (Shapiro-Wilk, Pearson et Anderson-Darling) valent NaN.
+        """
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # Désactiver temporairement l'affichage des avertissements
+            dist, n = self._frozen(), np.sum(self.weights)
+            emp = self.weights / n
+            # Basic Tests (les deux fonctions de masse sont évaluées sur les mêmes valeurs : aucun écart sur X)
+            self.results["MSE"] = np.mean((emp - self.pmf) ** 2)
+            self.results["MSE Scale"] = 0.0
+            self.results["MSE Curve"] = self.results["MSE"]
+            skew, kurtosis = get_moments(self.data, self.weights)
+            skew_model, kurtosis_model = dist.stats(moments="sk")
+            self.results["Delta Kurtosis"] = np.fabs(kurtosis - kurtosis_model)
+            self.results["Delta Skewness"] = np.fabs(skew - skew_model)
+            # Kolmogorov-Smirnov (KS) Test : l'écart maximal est atteint sur une valeur distincte ou juste avant
+            emp_cdf = np.cumsum(emp)
+            d = max(np.max(np.fabs(emp_cdf - dist.cdf(self.data))), np.max(np.fabs(emp_cdf - emp - dist.cdf(self.data - 1))))
+            ks = np.round([d, stats.kstwobign.sf(d * np.sqrt(n))], 3)
+            self.results["Kolmogorov-Smirnov Test"] = dict(P=ks[0], S=ks[1])
+            self.results["Shapiro-Wilk Test"] = dict(P=np.nan, S=np.nan)
+            # Wasserstein Test
+            pmf_tests = two_sample_tests(emp, self.pmf)
+            self.results["Wasserstein Distance"] = pmf_tests["Wasserstein Distance"]
+            # Pearson Correlation Test
+            self.results["Pearson Correlation Test on values"] = dict(P=np.nan, S=np.nan)
+            s, p = stats.pearsonr(emp, self.pmf) if len(emp) > 1 else (np.nan, np.nan)
+            self.results["Pearson Correlation Test on KDE"] = dict(P=p, S=s)
+            # Anderson-Darling Test
+            self.results["Anderson-Darling Test on values"] = dict(P=np.nan, S=np.nan)
+            self.results["Anderson-Darling Test on KDE"] = dict(P=pmf_tests["AD P-Value"], S=pmf_tests["AD Statistic"])
+
+##################################################
+class Poisson(_BaseDiscrete):
+    __slots__ = ()
+
+    ##################################################
+    @staticmethod
+    def _get_type(): return "Poisson"
+
+    ##################################################
+    def _frozen(self): return stats.poisson(self.params["Lambda"])
+
+    ##################################################
+    def _cost(self, params: np.ndarray):
+        self.params["Lambda"] = params[0]
+        return self._neg_log_likelihood(self._frozen().pmf(self.data))
+
+    ##################################################
+    def _find_parameters(self):
+        self.params = dict(Lambda=np.average(self.data, weights=self.weights))  # Maximum de vraisemblance exact
+
+##################################################
+class Geometric(_BaseDiscrete):
+    """ Loi géométrique du nombre d'échecs avant le premier succès (valeurs à partir de 0) """
+    __slots__ = ()
+
+    ##################################################
+    @staticmethod
+    def _get_type(): return "Geometric"
+
+    ##################################################
+    def _frozen(self): return stats.geom(self.params["Probability"], loc=-1)
+
+    ##################################################
+    def _cost(self, params: np.ndarray):
+        self.params["Probability"] = params[0]
+        return self._neg_log_likelihood(self._frozen().pmf(self.data))
+
+    ##################################################
+    def _find_parameters(self):
+        self.params = dict(Probability=1 / (1 + np.average(self.data, weights=self.weights)))  # Maximum de vraisemblance exact
+
+##################################################
+class Binomial(_BaseDiscrete):
+    __slots__ = ()
+    N_CANDIDATES = 100  # Nombre de valeurs de N testées à chaque étape de la recherche
+
+    ##################################################
+    @staticmethod
+    def _get_type(): return "Binomial"
+
+    ##################################################
+    def _frozen(self): return stats.binom(self.params["N"], self.params["P"])
+
+    ##################################################
+    def _cost(self, params: np.ndarray):
+        self.params["N"], self.params["P"] = int(round(params[0])), params[1]
+        return self._neg_log_likelihood(self._frozen().pmf(self.data))
+
+    ##################################################
+    def _profile(self, n: np.ndarray, mean: float):
+        """
+        Vraisemblance profilée : pour chaque N, P = moyenne / N est le maximum de vraisemblance
+        Toutes les vraisemblances sont calculées en une matrice (candidats, valeurs distinctes).
+        :param n: Valeurs de N candidates
+        :param mean: Moyenne des données
+        :return: Le couple (log-vraisemblances, P)
+        """
+        p = np.minimum(mean / n, 1.0)
+        return stats.binom.logpmf(self.data[None, :], n[:, None], p[:, None]) @ self.weights, p
+
+    ##################################################
+    def _find_parameters(self):
+        # Recherche de N autour de l'estimateur des moments N ≈ moyenne² / (moyenne - variance), au moins égal à la valeur maximale.
+        # Sans sous-dispersion, la vraisemblance croît avec N (loi de Poisson limite) : la recherche s'arrête à 100 fois le maximum.
+        # Grille géométrique puis resserrement autour du meilleur candidat (la vraisemblance profilée est unimodale en N).
+        mean, var = self._mean_var()
+        low = max(int(np.max(self.data)), 1)
+        high = max(low + self.N_CANDIDATES, min(4 * mean ** 2 / (mean - var) if var < mean else np.inf, 100 * low))
+        n = np.unique(np.r_[np.arange(low, low + self.N_CANDIDATES), np.round(np.geomspace(low, high, self.N_CANDIDATES))]).astype(int)
+        while True:
+            ll, p = self._profile(n, mean)
+            best = np.argmax(ll)
+            if len(n) == 1 or np.all(np.diff(n) == 1): break
+            start, stop = n[max(best - 1, 0)], n[min(best + 1, len(n) - 1)]  # Le maximum est entre les voisins du meilleur candidat
+            n = np.unique(np.round(np.linspace(start, stop, min(stop - start + 1, self.N_CANDIDATES)))).astype(int)
+        self.params = dict(N=int(n[best]), P=p[best])
+        self.log_likelihood = ll[best]
+
+##################################################
+class NegativeBinomial(_BaseDiscrete):
+    __slots__ = ()
+
+    ##################################################
+    @staticmethod
+    def _get_type(): return "Negative Binomial"
+
+    ##################################################
+    def _frozen(self): return stats.nbinom(self.params["R"], self.params["P"])
+
+    ##################################################
+    def _cost(self, params: np.ndarray):
+        # Optimisation sur log(R) (toujours positif), P = R / (R + moyenne) est le maximum de vraisemblance pour R fixé
+        mean, _ = self._mean_var()
+        self.params["R"] = np.exp(params[0])
+        self.params["P"] = self.params["R"] / (self.params["R"] + mean)
+        return self._neg_log_likelihood(self._frozen().pmf(self.data))
+
+    ##################################################
+    def _find_parameters(self):
+        mean, var = self._mean_var()
+        r = mean ** 2 / (var - mean) if var > mean else 1e3  # Départ par la méthode des moments (loi de Poisson limite si pas de surdispersion)
+        self._minimize(np.array([np.log(max(r, 1e-3))]))
+
+# ==================================================
+# endregion Discrete Distribution Classes
+# ==================================================
+
 # # ==================================================
 # # region Chi-Square Distribution Class
 # # ==================================================
@@ -445,35 +1195,6 @@ class Gamma(_BaseDistribution):
 # # ==================================================
 #
 # # ==================================================
-# # region Geometric Distribution Class
-# # ==================================================
-# class Geometric(_BaseDistribution):
-#     ##################################################
-#     @staticmethod
-#     def _get_type(): return "Geometric"
-#
-#     ##################################################
-#     def _cost(self, params: np.ndarray):
-#         self.params["Probability"] = params[0]
-#         return -np.sum(np.log(stats.geom(self.params["Probability"]).cdf(self.data)))
-#
-#     ##################################################
-#     def _find_parameters(self):
-#         with warnings.catch_warnings():
-#             warnings.simplefilter("ignore")  # Désactiver temporairement l'affichage des avertissements
-#             # On ajoute une limite pour que la probabilité soit entre 0 et 1.
-#             minimize(self._cost, np.array([1.0, 1.0]), method='Nelder-Mead', bounds=[(0.0, 1.0)])
-#         self._make_distribution()
-#
-#     ##################################################
-#     def _make_distribution(self):
-#         self.data_gen = np.random.geometric(self.params["Probability"], len(self.data))
-#
-# # ==================================================
-# # endregion Geometric Distribution Class
-# # ==================================================
-#
-# # ==================================================
 # # region Laplace Distribution Class
 # # ==================================================
 # class Laplace(_BaseDistribution):
@@ -562,6 +1283,18 @@ if __name__ == "__main__":
         print(f"Gamma Distribution with {n} sample : Original Shape ({shape}) VS Founded Shape ({dist.params['Shape']})")
         print(dist)
 
+    # Weighted histogram with empty bins (zero weights where the density is zero)
+    print("\n**************************************************")
+    print("********** Weighted Histogram with empty bins : **********")
+    counts, edges = np.histogram(np.random.exponential(scale, 10000), bins=np.arange(-2, 40, 0.5))
+    centers = (edges[:-1] + edges[1:]) / 2
+    for cls in [Exponential, Gamma, Power, Beta]:
+        dist = cls(centers, weights=counts)
+        assert not np.isnan(dist.log_likelihood), f"{dist.type} : log-likelihood {dist.log_likelihood}"  # -inf hors du support (Power, Beta)
+        print(f"{dist.type} : {dist.params} (Log-Likelihood {dist.log_likelihood:.2f}, BIC {dist.results['BIC']:.2f})")
+    dist = Exponential(centers, weights=counts)
+    assert abs(dist.params["Scale"] - scale) < 0.3, dist.params
+
     # Check Distributions
     for n in sizes:
         results = check_distributions(np.random.normal(mu, sigma, n))
@@ -570,7 +1303,9 @@ if __name__ == "__main__":
 # endregion Tests
 # ==================================================
 
-ALL_DISTRIBUTIONS = [Normal, Log, Exponential, Power, Beta, Gamma]
+MIXTURE_DISTRIBUTIONS = [NormalMixture, LogMixture, GammaMixture]
+DISCRETE_DISTRIBUTIONS = [Poisson, Geometric, Binomial, NegativeBinomial]
+ALL_DISTRIBUTIONS = [Normal, Log, Exponential, Power, Beta, Gamma] + MIXTURE_DISTRIBUTIONS
 
 # Liste des symboles à exporter (pour limiter les accès)
 # __all__ = ["check_distributions", "Normal", "Exponential", "Power", "Log"]
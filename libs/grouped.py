@@ -0,0 +1,244 @@
+""" Analyse groupée : recherche de la meilleure distribution pour chaque groupe d'un long tableau """
+
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy.special import betaln, digamma, gammaln, polygamma
+
+from libs.distributions import Beta, Exponential, Gamma, Geometric, Log, Normal, Poisson, Power, combine_distributions
+from libs.utils import is_integer_data
+
+# Colonnes de métriques complètes (calculées seulement pour les meilleures familles de chaque groupe)
+METRIC_COLUMNS = ["MSE", "MSE Scale", "MSE Curve", "Delta Kurtosis", "Delta Skewness",
+                  "Kolmogorov-Smirnov Test", "Shapiro-Wilk Test", "Wasserstein Distance",
+                  "Pearson Correlation Test on values", "Pearson Correlation Test on KDE",
+                  "Anderson-Darling Test on values", "Anderson-Darling Test on KDE"]
+
+# ==================================================
+# region Segmented Statistics
+# ==================================================
+##################################################
+def _segments(groups: np.ndarray, values: np.ndarray):
+    """
+    Trie les valeurs par groupe (une seule fois) et repère le début de chaque groupe
+    :param groups: Clé de groupe de chaque valeur
+    :param values: Valeurs
+    :return: Un tuple (clés des groupes, indices de début de chaque groupe, valeurs triées par groupe)
+    """
+    # Codes entiers : le tri ne compare jamais les clés d'origine (chaînes par exemple). Une clé manquante (NaN, None) forme son propre groupe.
+    codes, keys = pd.factorize(groups, sort=True, use_na_sentinel=False)
+    order = np.argsort(codes, kind="stable")
+    codes = codes[order]
+    starts = np.flatnonzero(np.concatenate([[True], codes[1:] != codes[:-1]]))
+    return np.asarray(keys), starts, values[order]
+
+##################################################
+def _sufficient_statistics(x: np.ndarray, starts: np.ndarray):
+    """
+    Calcule les statistiques suffisantes de chaque groupe par réductions segmentées (np.add.reduceat)
+    :param x: Valeurs triées par groupe
+    :param starts: Indices de début de chaque groupe
+    :return: Dictionnaire de tableaux (une valeur par groupe)
+    """
+    positive = x > 0
+    unit = positive & (x < 1)
+    log_x = np.log(np.where(positive, x, 1.0))
+    log_1mx = np.log1p(-np.where(unit, x, 0.0))
+    st = dict(N=np.diff(np.concatenate([starts, [len(x)]])).astype(np.float64),
+              Sum=np.add.reduceat(x, starts), Sum2=np.add.reduceat(x * x, starts),
+              SumLog=np.add.reduceat(log_x, starts), SumLog2=np.add.reduceat(log_x * log_x, starts),
+              SumLog1m=np.add.reduceat(log_1mx, starts),
+              Min=np.minimum.reduceat(x, starts), Max=np.maximum.reduceat(x, starts),
+              Positive=np.add.reduceat(positive, starts), Unit=np.add.reduceat(unit, starts))
+    st["Mean"] = st["Sum"] / st["N"]
+    st["Var"] = np.maximum(st["Sum2"] / st["N"] - st["Mean"] ** 2, 0.0)
+    return st
+
+##################################################
+def _gamma_shape(mean_log: np.ndarray, iterations: int = 20):
+    """
+    Résout digamma(k) = mean_log (maximum de vraisemblance d'une loi Gamma d'échelle 1) par Newton, pour tous les groupes à la fois
+    :param mean_log: Moyenne du logarithme de chaque groupe
+    :param iterations: Nombre d'itérations de Newton
+    :return: Forme de chaque groupe
+    """
+    # Départ de Minka pour l'inverse de digamma
+    k = np.where(mean_log >= -2.22, np.exp(mean_log) + 0.5, -1 / (mean_log - digamma(1)))
+    for _ in range(iterations):
+        k = np.maximum(k - (digamma(k) - mean_log) / polygamma(1, k), 1e-8)
+    return k
+
+# ==================================================
+# endregion Segmented Statistics
+# ==================================================
+
+# ==================================================
+# region Closed-Form Fits
+# ==================================================
+##################################################
+def _closed_form_fits(st: dict, discrete: bool, sum_log_factorial: np.ndarray = None):
+    """
+    Ajuste toutes les familles sur tous les groupes à la fois à partir des statistiques suffisantes.
+    Les paramètres suivent ceux des classes de libs.distributions (loi log-normale de forme seule, loi Gamma d'échelle 1, ...).
+    La loi Beta est ajustée par la méthode des moments, les autres au maximum de vraisemblance.
+    Une famille dont le support ne contient pas toutes les valeurs d'un groupe a une log-vraisemblance de -inf pour ce groupe.
+    :param st: Statistiques suffisantes (voir _sufficient_statistics)
+    :param discrete: Ajoute les familles discrètes (Poisson, Geometric)
+    :param sum_log_factorial: Σ log(x!) de chaque groupe (pour la loi de Poisson)
+    :return: Liste de tuples (classe, paramètres {nom: tableau par groupe}, log-vraisemblance par groupe, nombre de paramètres)
+    """
+    n, mean, var = st["N"], st["Mean"], st["Var"]
+    all_positive, all_unit = st["Positive"] == n, st["Unit"] == n
+    mean_log = st["SumLog"] / n
+    fits = []
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Normal
+        sigma = np.sqrt(var)
+        fits.append((Normal, dict(Mu=mean, Sigma=sigma), -n / 2 * (np.log(2 * np.pi * var) + 1), 2))
+        # Log (loi log-normale de forme seule : s² = moyenne de log(x)²)
+        shape = np.sqrt(st["SumLog2"] / n)
+        ll = -n * np.log(shape) - st["SumLog"] - n / 2 * np.log(2 * np.pi) - n / 2
+        fits.append((Log, dict(Shape=shape), np.where(all_positive, ll, -np.inf), 1))
+        # Exponential
+        ll = -n * np.log(mean) - n
+        fits.append((Exponential, dict(Scale=mean), np.where(st["Min"] >= 0, ll, -np.inf), 1))
+        # Power (support [0, 1])
+        alpha = -n / st["SumLog"]
+        ll = n * np.log(alpha) + (alpha - 1) * st["SumLog"]
+        fits.append((Power, dict(Alpha=alpha), np.where(all_positive & (st["Max"] <= 1), ll, -np.inf), 1))
+        # Beta (méthode des moments, support ]0, 1[)
+        common = mean * (1 - mean) / var - 1
+        a, b = mean * common, (1 - mean) * common
+        ll = (a - 1) * st["SumLog"] + (b - 1) * st["SumLog1m"] - n * betaln(a, b)
+        fits.append((Beta, dict(A=a, B=b), np.where(all_unit & (a > 0) & (b > 0), ll, -np.inf), 2))
+        # Gamma (échelle 1)
+        k = _gamma_shape(mean_log)
+        ll = (k - 1) * st["SumLog"] - st["Sum"] - n * gammaln(k)
+        fits.append((Gamma, dict(Shape=k), np.where(all_positive, ll, -np.inf), 1))
+        if discrete:
+            # Poisson
+            ll = st["Sum"] * np.log(mean) - n * mean - sum_log_factorial
+            fits.append((Poisson, dict(Lambda=mean), np.where(mean > 0, ll, -np.inf), 1))
+            # Geometric (nombre d'échecs avant le premier succès)
+            p = 1 / (1 + mean)
+            fits.append((Geometric, dict(Probability=p), n * np.log(p) + st["Sum"] * np.log1p(-p), 1))
+    return [(cls, params, np.where(np.isfinite(ll), ll, -np.inf), k) for cls, params, ll, k in fits]
+
+##################################################
+def _unit_bin_log_likelihood(cls, params: dict, x: np.ndarray, starts: np.ndarray):
+    """
+    Log-vraisemblance d'une famille continue sur des données entières regroupées en classes unitaires, pour tous les groupes à la fois :
+    chaque valeur x a la probabilité P(x - 0.5 < X <= x + 0.5) du modèle de son groupe, comme dans Distribution.discretize.
+    :param cls: Classe de la famille (voir libs.distributions)
+    :param params: Paramètres {nom: tableau par groupe}
+    :param x: Valeurs triées par groupe
+    :param starts: Indices de début de chaque groupe
+    :return: Log-vraisemblance par groupe (-inf si une valeur a une probabilité nulle)
+    """
+    analysis = cls(low_memory=True)
+    analysis.params = {name: np.repeat(v, np.diff(np.concatenate([starts, [len(x)]]))) for name, v in params.items()}
+    frozen = analysis._frozen()  # Paramètres de chaque valeur : scipy évalue toutes les lois en un seul appel
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ll = np.add.reduceat(np.log(frozen.cdf(x + 0.5) - frozen.cdf(x - 0.5)), starts)
+    return np.where(np.isfinite(ll), ll, -np.inf)
+
+# ==================================================
+# endregion Closed-Form Fits
+# ==================================================
+
+##################################################
+def check_distributions_grouped(df: pd.DataFrame, value_col: str, group_col: str, top_k: int = 2, bic_margin: float = 10.0,
+                                min_size: int = 10):
+    """
+    Recherche la meilleure distribution de chaque groupe d'un long tableau (un client, une machine, un capteur, ...).
+    Les données sont triées une seule fois par groupe, les statistiques suffisantes sont obtenues par réductions segmentées
+    et toutes les familles sont ajustées en forme close sur tous les groupes à la fois (voir _closed_form_fits).
+    Les familles sont classées par BIC dans chaque groupe. Sur des données entières, les familles discrètes sont ajoutées
+    et la log-vraisemblance des familles continues est calculée sur des classes unitaires (comme dans check_distributions). Les métriques complètes (KDE, tests) ne sont calculées que là où le BIC
+    ne tranche pas : pour les top_k meilleures familles des groupes où l'écart de BIC entre les deux premières est inférieur à bic_margin
+    (10 est le seuil usuel d'une préférence "très forte") et qui ont au moins min_size valeurs.
+    :param df: Dataframe contenant les valeurs et les groupes
+    :param value_col: Nom de la colonne des valeurs
+    :param group_col: Nom de la colonne des groupes
+    :param top_k: Nombre de familles par groupe pour lesquelles les métriques complètes sont calculées (0 pour aucune)
+    :param bic_margin: Écart de BIC en dessous duquel un groupe est jugé ambigu (np.inf pour calculer les métriques de tous les groupes)
+    :param min_size: Taille minimale d'un groupe pour calculer les métriques complètes
+    :return: Dataframe avec une ligne par couple (groupe, famille) trié par groupe puis rang, contenant les paramètres,
+    la log-vraisemblance, l'AIC, le BIC, le rang et les métriques (NaN si non calculées)
+    """
+    if len(df) == 0: raise ValueError("Empty dataframe is not allowed.")
+    values = df[value_col].to_numpy(dtype=np.float64)
+    keys, starts, x = _segments(df[group_col].to_numpy(), values)
+    st = _sufficient_statistics(x, starts)
+    discrete = is_integer_data(x)
+    fits = _closed_form_fits(st, discrete, np.add.reduceat(gammaln(x + 1), starts) if discrete else None)
+    if discrete:  # Une densité évaluée sur des entiers ne se compare pas à une fonction de masse : familles continues sur classes unitaires
+        fits = [(cls, params, ll if cls in (Poisson, Geometric) else _unit_bin_log_likelihood(cls, params, x, starts), k)
+                for cls, params, ll, k in fits]
+
+    n_groups, n_fam = len(keys), len(fits)
+    ll = np.vstack([f[2] for f in fits])                                    # (familles, groupes)
+    n_params = np.array([f[3] for f in fits], dtype=np.float64)[:, None]
+    aic = 2 * n_params - 2 * ll
+    bic = n_params * np.log(st["N"])[None, :] - 2 * ll
+    rank = np.argsort(np.argsort(bic, axis=0, kind="stable"), axis=0) + 1  # Rang de chaque famille dans son groupe (1 = meilleure)
+
+    table = pd.DataFrame({"Group": np.tile(keys, n_fam),
+                          "Distribution": np.repeat([f[0]._get_type() for f in fits], n_groups),
+                          "Parameters": [" ".join(f"{name} ({values[g]})" for name, values in f[1].items()) + " " for f in fits for g in range(n_groups)],
+                          "N": np.tile(st["N"].astype(np.int64), n_fam),
+                          "Log-Likelihood": ll.ravel(), "AIC": aic.ravel(), "BIC": bic.ravel(), "Rank": rank.ravel()})
+    for c in METRIC_COLUMNS: table[c] = np.nan
+
+    # Métriques complètes seulement là où elles servent : meilleures familles des groupes ambigus et assez grands
+    sorted_bic = np.sort(bic, axis=0)
+    needed = (sorted_bic[1] - sorted_bic[0] < bic_margin) & (st["N"] >= min_size)
+    ends = np.concatenate([starts[1:], [len(x)]])
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for f, g in zip(*np.nonzero((rank <= top_k) & needed[None, :] & np.isfinite(ll))):
+            cls, params = fits[f][0], {name: v[g] for name, v in fits[f][1].items()}
+            analysis = cls(low_memory=True)
+            analysis.evaluate(x[starts[g]:ends[g]], params)
+            res = combine_distributions([analysis]).iloc[0]
+            table.loc[f * n_groups + g, METRIC_COLUMNS] = res[METRIC_COLUMNS].to_numpy(dtype=np.float64)
+
+    return table.sort_values(by=["Group", "Rank"], kind="stable").reset_index(drop=True)
+
+# ==================================================
+# region Tests
+# ==================================================
+if __name__ == "__main__":
+    import time
+    n_groups, size = 5000, 200
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({"Host": np.repeat([f"host-{i:05d}" for i in range(n_groups)], size),
+                         "Latency": np.concatenate([rng.gamma(rng.uniform(1, 5), 1.0, size) for _ in range(n_groups)])})
+    t = time.perf_counter()
+    result = check_distributions_grouped(data, "Latency", "Host")
+    print(f"{n_groups} groupes de {size} valeurs analysés en {time.perf_counter() - t:.2f}s")
+    best = result[result["Rank"] == 1]
+    print(best["Distribution"].value_counts())
+    print(f"Métriques complètes calculées pour {result['MSE'].notna().sum()} lignes sur {len(result)}")
+    print(best.head())
+
+    # Clés manquantes : un groupe à part entière
+    data.loc[:size - 1, "Host"] = np.nan
+    result = check_distributions_grouped(data.iloc[:3 * size], "Latency", "Host", top_k=0)
+    assert result["Group"].isna().sum() == result["Distribution"].nunique(), result
+    assert (result.loc[result["Group"].isna(), "N"] == size).all()
+    print(f"Groupes avec une clé manquante : {result['Group'].nunique(dropna=False)} groupes")
+
+    # Données entières : les familles continues sont notées sur des classes unitaires et ne battent pas la loi de Poisson
+    data = pd.DataFrame({"Host": np.repeat(np.arange(50), size), "Count": rng.poisson(2, 50 * size)})
+    result = check_distributions_grouped(data, "Count", "Host", top_k=0)
+    best = result.loc[result["Rank"] == 1, "Distribution"].value_counts()
+    assert best.get("Poisson", 0) >= 40, best
+    print(f"Données entières : {best.to_dict()}")
+# ==================================================
+# endregion Tests
+# ==================================================
+
+# Liste des symboles à exporter (pour limiter les accès)
+__all__ = ["check_distributions_grouped"]
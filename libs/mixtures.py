@@ -0,0 +1,303 @@
+""" Ajustement de mélanges finis par l'algorithme EM (Expectation-Maximization) vectorisé """
+
+import numpy as np
+from scipy.special import gammaln
+
+FAMILIES = ("Normal", "Log", "Gamma")
+EVAL_CHUNK = 65536  # Nombre de valeurs évaluées à la fois par MixtureDistribution (tableaux intermédiaires de EVAL_CHUNK x k valeurs)
+# Plancher des variances des composantes (dans l'unité des données) pour éviter qu'une composante s'effondre sur des valeurs répétées :
+# variance de quantification de la résolution des données (écart minimal entre deux valeurs distinctes, 1 pour des entiers),
+# et au moins MIN_VARIANCE_RATIO fois la variance totale (données continues, dont la résolution est négligeable)
+MIN_VARIANCE_RATIO = 1e-4
+
+# ==================================================
+# region Tools
+# ==================================================
+##################################################
+def _weighted_quantiles(x: np.ndarray, q: np.ndarray, weights: np.ndarray = None):
+    """
+    Quantiles (éventuellement pondérés) d'une distribution
+    :param x: Distribution
+    :param q: Niveaux des quantiles (entre 0 et 1)
+    :param weights: Poids de chaque valeur, None pour des poids identiques
+    :return: Les quantiles
+    """
+    if weights is None: return np.quantile(x, q)
+    order = np.argsort(x)
+    cdf = np.cumsum(weights[order])
+    return np.interp(q * cdf[-1], cdf, x[order])
+
+##################################################
+def _log_pdf_coefficients(family: str, pi: np.ndarray, loc: np.ndarray, scale: np.ndarray):
+    """
+    Coefficients (k, 3) tels que log(π_j f_j(x)) = coef[j] @ [1, x, t(x)], avec t(x) = x² (Normal) ou log(x) (Gamma).
+    Les log-densités de toutes les composantes s'obtiennent ainsi par un seul produit matriciel (k, 3) @ (3, n).
+    :param family: "Normal" (Log est ajusté comme une normale sur le logarithme) ou "Gamma"
+    :param pi: Poids des k composantes
+    :param loc: Moyennes (Normal) ou formes (Gamma) des k composantes
+    :param scale: Écarts-types (Normal) ou échelles (Gamma) des k composantes
+    :return: Tableau (k, 3)
+    """
+    if family == "Gamma":
+        return np.column_stack([np.log(pi) - gammaln(loc) - loc * np.log(scale), -1 / scale, loc - 1])
+    inv_var = 1 / scale ** 2
+    return np.column_stack([np.log(pi) - 0.5 * loc ** 2 * inv_var - np.log(scale) - 0.5 * np.log(2 * np.pi), loc * inv_var, -0.5 * inv_var])
+
+##################################################
+def variance_floor(data: np.ndarray, weights: np.ndarray = None):
+    """
+    Plancher des variances des composantes d'un mélange ajusté sur ces données (voir MIN_VARIANCE_RATIO)
+    :param data: Distribution (dans l'unité d'origine, avant le logarithme d'un mélange log-normal)
+    :param weights: Poids de chaque valeur, None pour des poids identiques
+    :return: La variance minimale d'une composante
+    """
+    x = np.asarray(data, dtype=np.float64)
+    values = np.unique(x if weights is None else x[np.asarray(weights) > 0])
+    gaps = np.diff(values)
+    resolution = np.min(gaps) if len(gaps) else 0.0
+    mean = np.average(x, weights=weights)
+    total_var = np.average((x - mean) ** 2, weights=weights)
+    return max(resolution ** 2 / 12, MIN_VARIANCE_RATIO * total_var, np.finfo(np.float64).tiny)
+
+##################################################
+def _gamma_shape(mean: np.ndarray, mean_log: np.ndarray):
+    """
+    Approximation de la forme d'une loi Gamma au maximum de vraisemblance (Minka), sans itération
+    :param mean: Moyennes pondérées des composantes
+    :param mean_log: Moyennes pondérées du logarithme des composantes
+    :return: Formes des composantes
+    """
+    s = np.maximum(np.log(mean) - mean_log, 1e-12)
+    return (3 - s + np.sqrt((s - 3) ** 2 + 24 * s)) / (12 * s)
+
+# ==================================================
+# endregion Tools
+# ==================================================
+
+# ==================================================
+# region EM Functions
+# ==================================================
+##################################################
+def fit_mixture(data: np.ndarray, k: int, family: str = "Normal", weights: np.ndarray = None, init: dict = None,
+                max_iter: int = 200, tol: float = 1e-6, min_variance: float = None):
+    """
+    Ajuste un mélange de k composantes par l'algorithme EM.
+    Les responsabilités sont calculées en une seule matrice en espace logarithmique (log-sum-exp) à chaque itération.
+    Elle est stockée transposée (k, n) : les réductions sur les composantes deviennent des opérations entre k lignes contiguës, bien plus rapides.
+    Les paramètres renvoyés sont ceux du dernier M-step, la log-vraisemblance celle du dernier E-step.
+    :param data: Distribution (strictement positive pour Log et Gamma)
+    :param k: Nombre de composantes
+    :param family: Famille des composantes ("Normal", "Log" ou "Gamma")
+    :param weights: Poids ou effectifs de chaque valeur, None pour des poids identiques
+    :param init: Paramètres de départ (résultat d'un précédent fit_mixture), None pour partir des quantiles
+    :param max_iter: Nombre maximal d'itérations
+    :param tol: Arrêt lorsque la variation relative de la log-vraisemblance est inférieure à tol
+    :param min_variance: Variance minimale d'une composante dans l'unité des données (None pour variance_floor) : la vraisemblance reste bornée
+    même si une composante se resserre sur une valeur répétée (forme Gamma bornée, écart-type log-normal borné autour de sa médiane)
+    :return: Un dictionnaire contenant les poids, positions et échelles des composantes (triées par moyenne),
+    la log-vraisemblance (dans l'unité des données d'origine) et le nombre d'itérations
+    """
+    if family not in FAMILIES: raise ValueError(f"Unknown mixture family \"{family}\".")
+    x = np.asarray(data, dtype=np.float64)
+    if family != "Normal" and np.any(x <= 0): raise ValueError(f"{family} mixture needs strictly positive values.")
+    floor = variance_floor(x, weights) if min_variance is None else min_variance
+    if family == "Log": x = np.log(x)  # Un mélange log-normal est un mélange normal sur le logarithme
+    # Statistiques suffisantes [1, x, t(x)] (pondérées une seule fois) : l'E-step et le M-step sont chacun un produit matriciel
+    design = np.vstack([np.ones(len(x)), x, np.log(x) if family == "Gamma" else x ** 2])
+    weighted = design if weights is None else design * np.asarray(weights, dtype=np.float64)
+    total = np.sum(weighted[0])
+
+    # Départ : quantiles régulièrement espacés, écarts-types identiques et poids uniformes
+    if init is None:
+        mean = _weighted_quantiles(x, (2 * np.arange(k) + 1) / (2 * k), weights)
+        var = np.full(k, (np.dot(weighted[1], x) - np.sum(weighted[1]) ** 2 / total) / total / k ** 2)
+        var = np.maximum(var, floor * np.exp(-2 * mean) if family == "Log" else floor)
+        pi = np.full(k, 1 / k)
+        loc, scale = (mean ** 2 / var, var / mean) if family == "Gamma" else (mean, np.sqrt(var))
+    else: pi, loc, scale = (np.array(init[key], dtype=np.float64) for key in ("Weights", "Loc", "Scale"))
+
+    ll, ll_old, it = -np.inf, -np.inf, 0
+    for it in range(1, max_iter + 1):
+        # E-step : responsabilités (k, n) normalisées en espace logarithmique (log-sum-exp)
+        log_prob = _log_pdf_coefficients(family, pi, loc, scale) @ design
+        m = np.max(log_prob, axis=0)
+        resp = np.exp(log_prob - m, out=log_prob)
+        norm = np.sum(resp, axis=0)
+        resp /= norm
+        ll = np.dot(weighted[0], np.log(norm) + m)
+        # M-step : sommes pondérées des statistiques suffisantes par composante
+        stats = weighted @ resp.T
+        nk = np.maximum(stats[0], 1e-300)
+        pi, mean = nk / total, stats[1] / nk
+        if family == "Gamma":
+            loc = np.minimum(_gamma_shape(mean, stats[2] / nk), mean ** 2 / floor)  # Variance moyenne² / forme
+            scale = mean / loc
+        else:
+            loc = mean
+            # Variance log-normale autour de la médiane m = exp(μ) : m² σ² (pour σ petit)
+            scale = np.sqrt(np.maximum(stats[2] / nk - mean ** 2, floor * np.exp(-2 * mean) if family == "Log" else floor))
+        if np.fabs(ll - ll_old) <= tol * np.fabs(ll): break
+        ll_old = ll
+
+    if family == "Log": ll -= np.sum(weighted[1])  # Jacobien du changement de variable (x contient ici le logarithme)
+    order = np.argsort(loc * scale if family == "Gamma" else loc)
+    return dict(Weights=pi[order], Loc=loc[order], Scale=scale[order], LogLikelihood=ll, Iterations=it)
+
+##################################################
+def select_mixture(data: np.ndarray, family: str = "Normal", weights: np.ndarray = None, k_max: int = 4, sample_size: int = 50000):
+    """
+    Choisit le nombre de composantes d'un mélange par le critère BIC puis ajuste le mélange retenu sur toutes les données.
+    Le choix est fait sur un sous-échantillon (si les données sont plus grandes que sample_size),
+    l'ajustement final part des paramètres trouvés sur ce sous-échantillon (démarrage à chaud).
+    :param data: Distribution
+    :param family: Famille des composantes ("Normal", "Log" ou "Gamma")
+    :param weights: Poids ou effectifs de chaque valeur, None pour des poids identiques
+    :param k_max: Nombre maximal de composantes testées
+    :param sample_size: Taille du sous-échantillon utilisé pour le choix du nombre de composantes
+    :return: Le résultat de fit_mixture pour le nombre de composantes retenu, complété par K et BIC
+    """
+    x = np.asarray(data, dtype=np.float64)
+    w = None if weights is None else np.asarray(weights, dtype=np.float64)
+    if len(x) > sample_size:
+        idx = np.random.default_rng(0).choice(len(x), sample_size, replace=False)  # Graine fixe : même choix pour les mêmes données
+        sub_x, sub_w = x[idx], None if w is None else w[idx]
+    else: sub_x, sub_w = x, w
+    n_sub = len(sub_x) if sub_w is None else np.sum(sub_w)
+    floor = variance_floor(x, w)  # Sur toutes les données, commun à tous les ajustements
+
+    best, best_bic = None, np.inf
+    for k in range(1, k_max + 1):
+        res = fit_mixture(sub_x, k, family, sub_w, tol=1e-5, min_variance=floor)  # Précision réduite, l'ajustement final repart de ces paramètres
+        bic = (3 * k - 1) * np.log(n_sub) - 2 * res["LogLikelihood"]
+        if bic < best_bic: best, best_bic = res, bic
+
+    k = len(best["Weights"])
+    if sub_x is not x: best = fit_mixture(x, k, family, w, init=best, min_variance=floor)
+    n = len(x) if w is None else np.sum(w)
+    best.update(K=k, BIC=(3 * k - 1) * np.log(n) - 2 * best["LogLikelihood"])
+    return best
+
+##################################################
+def sample_mixture(family: str, pi: np.ndarray, loc: np.ndarray, scale: np.ndarray, size: int):
+    """
+    Tire un échantillon d'un mélange
+    :param family: Famille des composantes ("Normal", "Log" ou "Gamma")
+    :param pi: Poids des composantes
+    :param loc: Positions (moyennes ou formes) des composantes
+    :param scale: Échelles des composantes
+    :param size: Taille de l'échantillon
+    :return: Échantillon de taille size
+    """
+    comp = np.random.choice(len(pi), size=size, p=pi / np.sum(pi))
+    if family == "Gamma": return np.random.gamma(loc[comp], scale[comp])
+    res = np.random.normal(loc[comp], scale[comp])
+    return np.exp(res) if family == "Log" else res
+
+##################################################
+class MixtureDistribution:
+    """
+    Distribution d'un mélange ajusté, avec la même interface que les distributions "gelées" de scipy (cdf, sf, ppf, pdf, logpdf)
+    Les composantes sont évaluées toutes ensemble (une colonne par composante), sans créer une distribution scipy par composante,
+    par blocs de EVAL_CHUNK valeurs : la mémoire de travail ne dépend pas de la taille des données.
+    """
+    __slots__ = ("family", "pi", "loc", "scale")
+
+    ##################################################
+    def __init__(self, family: str, pi: np.ndarray, loc: np.ndarray, scale: np.ndarray):
+        """
+        :param family: Famille des composantes ("Normal", "Log" ou "Gamma")
+        :param pi: Poids des composantes
+        :param loc: Positions (moyennes ou formes) des composantes
+        :param scale: Échelles des composantes
+        """
+        if family not in FAMILIES: raise ValueError(f"Unknown mixture family \"{family}\".")
+        self.family = family
+        self.pi, self.loc, self.scale = (np.asarray(v, dtype=np.float64) for v in (pi, loc, scale))
+
+    ##################################################
+    def _components(self):
+        """
+        Distribution scipy des composantes (paramètres vectorisés)
+        :return: Une distribution scipy dont chaque paramètre est un tableau de k valeurs
+        """
+        from scipy import stats
+        if self.family == "Gamma": return stats.gamma(self.loc, scale=self.scale)
+        if self.family == "Log": return stats.lognorm(self.scale, scale=np.exp(self.loc))
+        return stats.norm(self.loc, self.scale)
+
+    ##################################################
+    def support(self): return (-np.inf, np.inf) if self.family == "Normal" else (0.0, np.inf)
+
+    ##################################################
+    def _evaluate(self, method: str, x):
+        """
+        Évalue une fonction des composantes (pdf, cdf) et la combine selon les poids, par blocs de EVAL_CHUNK valeurs
+        :param method: Nom de la méthode scipy
+        :param x: Valeurs
+        :return: Tableau de la forme de x
+        """
+        x = np.asarray(x, dtype=np.float64)
+        flat = x.ravel()
+        res = np.empty(len(flat))
+        func = getattr(self._components(), method)
+        for start in range(0, len(flat), EVAL_CHUNK):
+            res[start:start + EVAL_CHUNK] = func(flat[start:start + EVAL_CHUNK, None]) @ self.pi
+        return res.reshape(x.shape)
+
+    ##################################################
+    def cdf(self, x): return self._evaluate("cdf", x)
+
+    ##################################################
+    def sf(self, x): return 1 - self.cdf(x)
+
+    ##################################################
+    def pdf(self, x): return self._evaluate("pdf", x)
+
+    ##################################################
+    def logpdf(self, x):
+        with np.errstate(divide="ignore"):
+            return np.log(self.pdf(x))
+
+    ##################################################
+    def ppf(self, u, grid_size: int = 20001):
+        """
+        Quantiles du mélange, par inversion numérique de la fonction de répartition sur une grille
+        :param u: Niveaux des quantiles (entre 0 et 1)
+        :param grid_size: Nombre de points de la grille
+        :return: Les quantiles
+        """
+        comp = self._components()
+        lo, hi = np.min(comp.ppf(1e-12)), np.max(comp.ppf(1 - 1e-12))
+        x = np.linspace(lo, hi, grid_size)
+        cdf = np.maximum.accumulate(self.cdf(x))
+        return np.interp(u, cdf, x)
+
+# ==================================================
+# endregion EM Functions
+# ==================================================
+
+# ==================================================
+# region Tests
+# ==================================================
+if __name__ == "__main__":
+    import time
+    x = np.concatenate([np.random.normal(-4, 1, 300000), np.random.normal(1, 0.5, 400000), np.random.normal(6, 2, 300000)])
+    t = time.perf_counter()
+    res = fit_mixture(x, 3)
+    print(f"Mélange de 3 normales sur {len(x)} valeurs en {time.perf_counter() - t:.3f}s ({res['Iterations']} itérations) : {res}")
+    t = time.perf_counter()
+    res = select_mixture(x)
+    print(f"Choix du nombre de composantes sur {len(x)} valeurs en {time.perf_counter() - t:.3f}s : K = {res['K']}")
+    # Valeurs répétées : les composantes ne s'effondrent pas sur les valeurs (vraisemblance bornée)
+    x = np.repeat([1.0, 2.0], 50)
+    for family in FAMILIES:
+        res = select_mixture(x, family)
+        variance = res["Loc"] * res["Scale"] ** 2 if family == "Gamma" else res["Scale"] ** 2 * (np.exp(2 * res["Loc"]) if family == "Log" else 1)
+        assert np.all(variance >= variance_floor(x) * (1 - 1e-9)), (family, res)
+        print(f"{family} sur des valeurs répétées : K = {res['K']}, log-vraisemblance {res['LogLikelihood']:.2f}")
+# ==================================================
+# endregion Tests
+# ==================================================
+
+# Liste des symboles à exporter (pour limiter les accès)
+__all__ = ["fit_mixture", "select_mixture", "sample_mixture", "variance_floor", "MixtureDistribution"]
@@ -0,0 +1,238 @@
+""" Modèles ajustés sérialisables : tables de répartition précalculées pour évaluer rapidement de nouveaux lots """
+
+import json
+
+import numpy as np
+from scipy import stats
+from scipy.special import betaln, expit, gammaln, logsumexp
+
+MODEL_VERSION = 2  # 2 : bornes du support
+
+##################################################
+def _to_json(value):
+    """
+    Convertit un paramètre (flottant numpy, tableau, ...) en valeur JSON
+    :param value: Paramètre
+    :return: Valeur sérialisable
+    """
+    if isinstance(value, np.ndarray): return value.tolist()
+    if isinstance(value, np.generic): return value.item()
+    return value
+
+# ==================================================
+# region Tail Functions
+# ==================================================
+# Log-densités en forme close des familles intégrées (paramètres des classes de libs.distributions), utilisées au-delà de la table :
+# un prolongement linéaire n'est exact que pour des queues exponentielles (une queue normale décroît en -x²)
+##################################################
+def _normal_logpdf(x, mu, sigma): return -0.5 * ((x - mu) / sigma) ** 2 - np.log(sigma) - 0.5 * np.log(2 * np.pi)
+
+##################################################
+def _lognormal_logpdf(x, mu, sigma): return _normal_logpdf(np.log(x), mu, sigma) - np.log(x)
+
+##################################################
+def _gamma_logpdf(x, shape, scale): return (shape - 1) * np.log(x) - x / scale - gammaln(shape) - shape * np.log(scale)
+
+##################################################
+def _mixture_logpdf(component, weights, loc, scale, x):
+    """
+    Log-densité d'un mélange : log Σ π_j f_j(x)
+    :param component: Log-densité d'une composante (x, position, échelle)
+    :param weights: Poids des composantes
+    :param loc: Positions (ou formes) des composantes
+    :param scale: Échelles des composantes
+    :param x: Valeurs
+    :return: La log-densité en chaque valeur
+    """
+    loc, scale = np.asarray(loc, dtype=np.float64), np.asarray(scale, dtype=np.float64)
+    return logsumexp(np.log(np.asarray(weights, dtype=np.float64)) + component(x[:, None], loc, scale), axis=1)
+
+TAIL_LOGPDF = {
+    "Normal": lambda p, x: _normal_logpdf(x, p["Mu"], p["Sigma"]),
+    "Log": lambda p, x: _lognormal_logpdf(x, 0.0, p["Shape"]),
+    "Exponential": lambda p, x: -np.log(p["Scale"]) - x / p["Scale"],
+    "Power": lambda p, x: np.log(p["Alpha"]) + (p["Alpha"] - 1) * np.log(x),
+    "Beta": lambda p, x: (p["A"] - 1) * np.log(x) + (p["B"] - 1) * np.log1p(-x) - betaln(p["A"], p["B"]),
+    "Gamma": lambda p, x: _gamma_logpdf(x, p["Shape"], 1.0),
+    "Normal Mixture": lambda p, x: _mixture_logpdf(_normal_logpdf, p["Weights"], p["Mu"], p["Sigma"], x),
+    "Log Mixture": lambda p, x: _mixture_logpdf(_lognormal_logpdf, p["Weights"], p["Mu"], p["Sigma"], x),
+    "Gamma Mixture": lambda p, x: _mixture_logpdf(_gamma_logpdf, p["Weights"], p["Shape"], p["Scale"], x),
+}
+
+# ==================================================
+# endregion Tail Functions
+# ==================================================
+
+# ==================================================
+# region Fitted Model Class
+# ==================================================
+class FittedModel:
+    """
+    Modèle ajusté réduit à sa famille, ses paramètres et une table précalculée (valeurs, fonction de répartition, log-densité).
+    L'évaluation d'un lot (score) n'utilise que cette table : aucune distribution scipy n'est construite sur le chemin critique.
+    - Famille continue : la table suit les quantiles du modèle (plus serrés dans les queues), les valeurs intermédiaires sont interpolées.
+      Au-delà de la table, la log-densité est calculée en forme close pour les familles intégrées (voir TAIL_LOGPDF) ; pour une autre
+      famille, elle est prolongée linéairement (exact seulement pour des queues exponentielles, sous-estime la décroissance d'une queue
+      normale). Elle vaut -inf hors des bornes du support.
+    - Famille discrète : la table contient chaque entier du support utile, l'évaluation est une simple indexation.
+    """
+    __slots__ = ("family", "params", "discrete", "x", "cdf_table", "logpdf_table", "support")
+
+    ##################################################
+    def __init__(self, family: str, params: dict, discrete: bool, x: np.ndarray, cdf: np.ndarray, logpdf: np.ndarray,
+                 support: tuple = (-np.inf, np.inf)):
+        """
+        :param family: Nom de la famille (type de la distribution)
+        :param params: Paramètres de la distribution
+        :param discrete: Vrai pour une famille discrète
+        :param x: Valeurs de la table (croissantes)
+        :param cdf: Fonction de répartition en chaque valeur
+        :param logpdf: Log-densité (ou log-probabilité pour une famille discrète) en chaque valeur
+        :param support: Bornes (inférieure, supérieure) du support du modèle
+        """
+        self.family, self.params, self.discrete = family, dict(params), discrete
+        self.support = tuple(float(v) for v in support)
+        self.x, self.cdf_table, self.logpdf_table = (np.asarray(v, dtype=np.float64) for v in (x, cdf, logpdf))
+
+    ##################################################
+    def __str__(self): return f"Model : {self.family} {self.params} ({len(self.x)} table points)"
+
+    ##################################################
+    @classmethod
+    def from_frozen(cls, family: str, params: dict, frozen, discrete: bool = False, grid_size: int = 2001):
+        """
+        Construit la table à partir d'une distribution scipy (ou d'un objet ayant la même interface)
+        :param family: Nom de la famille
+        :param params: Paramètres de la distribution
+        :param frozen: Distribution "gelée" (cdf, ppf, support et logpdf ou logpmf)
+        :param discrete: Vrai pour une famille discrète
+        :param grid_size: Nombre de niveaux de quantiles (et de points réguliers) de la table (famille continue)
+        :return: Le modèle
+        """
+        support = frozen.support()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if discrete:
+                lo, hi = frozen.ppf([1e-12, 1 - 1e-12])
+                x = np.arange(max(lo - 1, 0), hi + 1)
+                return cls(family, params, True, x, frozen.cdf(x), frozen.logpmf(x), support)
+            # Niveaux de 1e-6 à 1 - 1e-6 serrés dans les queues, complétés par une grille régulière pour les zones de faible densité (entre deux modes)
+            x = frozen.ppf(expit(np.linspace(-14, 14, grid_size)))
+            x = x[np.isfinite(x)]
+            x = np.unique(np.concatenate([x, np.linspace(x[0], x[-1], grid_size)]))
+            return cls(family, params, False, x, frozen.cdf(x), frozen.logpdf(x), support)
+
+    ##################################################
+    def cdf(self, x):
+        """
+        Fonction de répartition
+        :param x: Valeurs
+        :return: P(X <= x)
+        """
+        x = np.asarray(x, dtype=np.float64)
+        if self.discrete:
+            idx = np.floor(x) - self.x[0]
+            res = self.cdf_table[np.clip(idx, 0, len(self.x) - 1).astype(np.int64)]
+            return np.where(idx < 0, 0.0, res)
+        return np.interp(x, self.x, self.cdf_table, left=0.0, right=1.0)
+
+    ##################################################
+    def sf(self, x):
+        """
+        Probabilité de queue
+        :param x: Valeurs
+        :return: P(X > x)
+        """
+        return 1 - self.cdf(x)
+
+    ##################################################
+    def ppf(self, u):
+        """
+        Quantiles du modèle
+        :param u: Niveaux des quantiles (entre 0 et 1)
+        :return: Les quantiles
+        """
+        u = np.asarray(u, dtype=np.float64)
+        if self.discrete: return self.x[np.minimum(np.searchsorted(self.cdf_table, u - 1e-12), len(self.x) - 1)]
+        return np.interp(u, self.cdf_table, self.x)
+
+    ##################################################
+    def logpdf(self, x):
+        """
+        Log-densité (ou log-probabilité pour une famille discrète)
+        :param x: Valeurs
+        :return: La log-densité en chaque valeur (-inf hors du support)
+        """
+        x = np.asarray(x, dtype=np.float64)
+        if self.discrete:
+            idx = x - self.x[0]
+            valid = (idx >= 0) & (idx < len(self.x)) & (np.mod(x, 1) == 0)
+            return np.where(valid, self.logpdf_table[np.where(valid, idx, 0).astype(np.int64)], -np.inf)
+        res = np.interp(x, self.x, self.logpdf_table)
+        outside = (x < self.x[0]) | (x > self.x[-1])
+        if np.any(outside):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                if self.family in TAIL_LOGPDF:
+                    res[outside] = TAIL_LOGPDF[self.family](self.params, x[outside])
+                else:  # Famille inconnue : prolongement linéaire des queues
+                    slope_lo = (self.logpdf_table[1] - self.logpdf_table[0]) / (self.x[1] - self.x[0])
+                    slope_hi = (self.logpdf_table[-1] - self.logpdf_table[-2]) / (self.x[-1] - self.x[-2])
+                    res = np.where(x < self.x[0], self.logpdf_table[0] + slope_lo * (x - self.x[0]), res)
+                    res = np.where(x > self.x[-1], self.logpdf_table[-1] + slope_hi * (x - self.x[-1]), res)
+        return np.where((x < self.support[0]) | (x > self.support[1]), -np.inf, res)
+
+    ##################################################
+    def score(self, batch: np.ndarray):
+        """
+        Évalue un lot de nouvelles valeurs par rapport au modèle en une seule passe sur le lot trié
+        :param batch: Nouvelles valeurs
+        :return: Un dictionnaire contenant la taille du lot, la statistique et la p-value du test de Kolmogorov-Smirnov,
+        la distance de Wasserstein, la log-vraisemblance totale et moyenne
+        """
+        s = np.sort(np.asarray(batch, dtype=np.float64).ravel())
+        n = len(s)
+        if n == 0: raise ValueError("Empty batch is not allowed.")
+        rank = np.arange(1, n + 1) / n                  # Fonction de répartition empirique en chaque valeur triée
+        if self.discrete:
+            # Valeurs distinctes du lot trié (sans nouveau tri) : l'écart maximal est atteint sur une valeur ou juste avant
+            last = np.flatnonzero(np.concatenate([s[1:] != s[:-1], [True]]))
+            first = np.concatenate([[0], last[:-1] + 1])
+            values = s[last]
+            ks = max(np.max(np.fabs(rank[last] - self.cdf(values))), np.max(np.fabs(first / n - self.cdf(values - 1))))
+        else:
+            cdf = self.cdf(s)
+            ks = max(np.max(rank - cdf), np.max(cdf - (rank - 1 / n)))
+        wasserstein = np.mean(np.fabs(s - self.ppf(rank - 0.5 / n)))
+        ll = np.sum(self.logpdf(s))
+        return {"N": n, "KS Statistic": ks, "KS P-Value": stats.kstwobign.sf(ks * np.sqrt(n)),
+                "Wasserstein Distance": wasserstein, "Log-Likelihood": ll, "Mean Log-Likelihood": ll / n}
+
+    ##################################################
+    def save(self, path: str):
+        """
+        Enregistre le modèle (fichier .npz, sans pickle)
+        :param path: Chemin du fichier
+        """
+        meta = json.dumps(dict(Version=MODEL_VERSION, Family=self.family, Discrete=self.discrete,
+                               Params={k: _to_json(v) for k, v in self.params.items()}))
+        np.savez(path, x=self.x, cdf=self.cdf_table, logpdf=self.logpdf_table, support=np.array(self.support), meta=np.array(meta))
+
+# ==================================================
+# endregion Fitted Model Class
+# ==================================================
+
+##################################################
+def load_model(path: str):
+    """
+    Charge un modèle enregistré par FittedModel.save
+    :param path: Chemin du fichier
+    :return: Le modèle
+    """
+    with np.load(path, allow_pickle=False) as f:
+        meta = json.loads(str(f["meta"]))
+        if meta["Version"] > MODEL_VERSION: raise ValueError(f"Unsupported model version {meta['Version']}.")
+        params = {k: np.array(v) if isinstance(v, list) else v for k, v in meta["Params"].items()}
+        support = f["support"] if "support" in f.files else (-np.inf, np.inf)  # Version 1 : support non enregistré
+        return FittedModel(meta["Family"], params, meta["Discrete"], f["x"], f["cdf"], f["logpdf"], support)
+
+# Liste des symboles à exporter (pour limiter les accès)
+__all__ = ["FittedModel", "load_model"]
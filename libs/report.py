@@ -34,6 +34,10 @@ def make_distribution_report(distribution: np.ndarray, analysis: dict, name: str
     md_txt = f"# Analyse de la distribution\n\n"
     md_txt += (f"Distribution de {len(distribution)} samples ({type(distribution[0])}) "
                f"comparé avec {len(dist_types)} distributions : {', '.join(t for t in dist_types)}\n")
+    rows = analysis.get("Rows", len(distribution))
+    if rows < len(distribution):
+        md_txt += (f"\n**Analyse progressive arrêtée sur un sous-échantillon : les résultats portent sur {rows} lignes sur "
+                   f"{len(distribution)}** (classement des meilleures familles stable entre les deux dernières étapes).\n")
 
     # Ajout de la figure
     md_txt += f"\n## Figures de comparaison entre la distribution actuelle et celles générées\n\n"
@@ -0,0 +1,447 @@
+""" Service d'analyse local (HTTP sur localhost ou socket Unix) avec regroupement des requêtes et processus de calcul préchauffés """
+
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+import numpy as np
+
+MAX_BODY_SIZE = 512 * 1024 * 1024  # Taille maximale d'une requête (octets)
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+               422: "Unprocessable Entity", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+# ==================================================
+# region Worker Functions
+# ==================================================
+# Exécutées dans les processus de calcul : les imports et le cache des fichiers restent chargés d'une requête à l'autre
+
+##################################################
+def _init_worker():
+    """ Préchauffe un processus de calcul : imports (scipy, pandas) et première analyse sur un petit échantillon """
+    import warnings
+    from libs.distributions import check_distributions
+    warnings.simplefilter("ignore")
+    check_distributions(np.random.default_rng(0).normal(size=100), plot=False)
+
+##################################################
+def _ping():
+    """ Tâche vide utilisée pour démarrer (et préchauffer) tous les processus """
+    return os.getpid()
+
+##################################################
+@lru_cache(maxsize=8)
+def _load_cached(path: str, column, dtype: str, mtime: float):
+    """
+    Charge un fichier une seule fois par processus (la date de modification invalide le cache)
+    :return: Les valeurs en lecture seule
+    """
+    from libs.utils import as_readonly, load_data
+    return as_readonly(load_data(path, column, np.dtype(dtype)))
+
+##################################################
+def _job_data(job: dict):
+    """
+    Valeurs et poids d'une requête
+    :param job: Requête décodée (tableau "data" ou fichier "path")
+    :return: (valeurs, poids)
+    """
+    if "path" not in job: return job["data"], job.get("weights")
+    path, dtype = job["path"], job.get("dtype", "float64")
+    mtime = os.path.getmtime(path)
+    data = _load_cached(path, job.get("column"), dtype, mtime)
+    weights = job.get("weights")
+    if isinstance(weights, (str, int)): weights = _load_cached(path, weights, "float64", mtime)  # Colonne d'effectifs du fichier
+    return data, weights
+
+##################################################
+def _analyze(job: dict):
+    """
+    Analyse d'une requête
+    :param job: Requête décodée
+    :return: Tableau récapitulatif (liste de lignes) et résultat du test de Box-Cox (None si les données ne sont pas strictement positives)
+    """
+    from libs.distributions import ALL_DISTRIBUTIONS, DISCRETE_DISTRIBUTIONS, check_distributions
+    data, weights = _job_data(job)
+    distributions = None
+    if job.get("distributions") is not None:
+        by_name = {d._get_type(): d for d in ALL_DISTRIBUTIONS + DISCRETE_DISTRIBUTIONS}
+        unknown = [name for name in job["distributions"] if name not in by_name]
+        if unknown: raise ValueError(f"Unknown distributions : {unknown}.")
+        distributions = [by_name[name] for name in job["distributions"]]
+    results = check_distributions(data, distributions, low_memory=True, weights=weights, discrete=job.get("discrete"), plot=False,
+                                  metrics=job.get("metrics", True))
+    box_cox = results["Box-Cox"]
+    return {"N": len(data), "Dataframe": results["Dataframe"].to_dict(orient="records"),
+            "Box-Cox": None if box_cox is None else {k: box_cox[k] for k in ("Lambda", "Mu", "Sigma")}}
+
+##################################################
+def _run_batch(jobs: list):
+    """
+    Analyse un lot de requêtes dans un même processus (un seul aller-retour pour plusieurs petites requêtes)
+    :param jobs: Requêtes décodées
+    :return: Liste de (statut HTTP, résultat ou message d'erreur)
+    """
+    import warnings
+    out = []
+    for job in jobs:
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                out.append((200, _analyze(job)))
+        except (ValueError, KeyError, TypeError, OSError) as e: out.append((422, f"{type(e).__name__}: {e}"))
+        except Exception as e: out.append((500, f"{type(e).__name__}: {e}"))
+    return out
+
+# ==================================================
+# endregion Worker Functions
+# ==================================================
+
+##################################################
+def _to_json(value):
+    """ Convertit les valeurs numpy en valeurs JSON (NaN et infinis deviennent null) """
+    if isinstance(value, dict): return {str(k): _to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)): return [_to_json(v) for v in value]
+    if isinstance(value, np.ndarray): return _to_json(value.tolist())
+    if isinstance(value, np.generic): value = value.item()
+    if isinstance(value, float) and not math.isfinite(value): return None
+    return value
+
+##################################################
+def _as_vector(value, name: str):
+    """
+    Convertit un champ JSON en vecteur de réels
+    :param value: Valeur décodée
+    :param name: Nom du champ (pour le message d'erreur)
+    :return: Le tableau float64 à une dimension
+    :raise ValueError: Si la valeur n'est pas une liste de nombres
+    """
+    if not isinstance(value, list) or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value):
+        raise ValueError(f"\"{name}\" must be a list of numbers.")
+    return np.asarray(value, dtype=np.float64)
+
+# ==================================================
+# region Service Class
+# ==================================================
+class _Job:
+    """ Requête en attente : contenu, taille (pour le regroupement) et futur de la réponse """
+    __slots__ = ("payload", "size", "future")
+
+    def __init__(self, payload: dict, size: int, future: asyncio.Future):
+        self.payload, self.size, self.future = payload, size, future
+
+class AnalysisService:
+    """
+    Service d'analyse asynchrone.
+    - Les requêtes sont placées dans une file bornée : lorsqu'elle est pleine, le service répond immédiatement 503 (Retry-After)
+      au lieu d'accumuler du travail (contre-pression).
+    - Un répartiteur attend qu'un processus soit libre puis envoie un lot : la première requête de la file et les petites requêtes
+      arrivées entre temps (au plus batch_size, attente de batch_window secondes au plus).
+    - Les processus de calcul sont démarrés et préchauffés au lancement, puis gardent leurs imports et leur cache de fichiers.
+
+    Routes :
+    - GET /health : état du service
+    - POST /analyze : corps JSON {"data": [...]} ou {"path": "...", "column": ...}, options "weights" (tableau ou colonne du fichier),
+      "path" est relatif au dossier de données du service (data_dir) et ne peut pas en sortir (403, toujours refusé sans data_dir),
+      "dtype", "distributions" (liste de noms), "discrete", "metrics" (false pour un classement par BIC seulement).
+      Un corps application/octet-stream est lu comme un tableau brut de float64.
+      Réponse : {"N", "Dataframe" (lignes du tableau de combine_distributions), "Box-Cox" (Lambda, Mu, Sigma)}
+    """
+    __slots__ = ("workers", "queue_size", "batch_size", "batch_window", "small_size", "data_dir", "_pool", "_queue", "_slots", "_tasks",
+                 "_server")
+
+    ##################################################
+    def __init__(self, workers: int = None, queue_size: int = 64, batch_size: int = 16, batch_window: float = 0.002, small_size: int = 10000,
+                 data_dir: str = None):
+        """
+        :param workers: Nombre de processus de calcul (par défaut le nombre de cœurs)
+        :param queue_size: Nombre maximal de requêtes en attente
+        :param batch_size: Nombre maximal de requêtes par lot
+        :param batch_window: Attente maximale (secondes) pour compléter un lot de petites requêtes
+        :param small_size: Taille en dessous de laquelle une requête peut être regroupée (les fichiers sont toujours traités seuls)
+        :param data_dir: Dossier des fichiers accessibles par "path" (None : requêtes de fichiers refusées)
+        """
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.queue_size, self.batch_size, self.batch_window, self.small_size = queue_size, batch_size, batch_window, small_size
+        self.data_dir = None if data_dir is None else os.path.realpath(data_dir)
+        self._pool, self._queue, self._slots, self._tasks, self._server = None, None, None, set(), None
+
+    ##################################################
+    def _resolve_path(self, path: str):
+        """
+        Chemin d'un fichier demandé par un client, limité au dossier de données (liens symboliques et ".." résolus)
+        :param path: Chemin reçu (relatif au dossier de données)
+        :return: Le chemin absolu
+        :raise PermissionError: Si le service n'a pas de dossier de données ou si le chemin en sort
+        """
+        if self.data_dir is None: raise PermissionError("File requests are disabled (no data directory).")
+        full = os.path.realpath(os.path.join(self.data_dir, path))
+        if os.path.commonpath([full, self.data_dir]) != self.data_dir: raise PermissionError(f"Path \"{path}\" is outside the data directory.")
+        return full
+
+    ##################################################
+    def _make_pool(self):
+        """ Crée le groupe de processus (spawn : aucun état de la boucle asyncio n'est hérité) """
+        return ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker)
+
+    ##################################################
+    async def start(self, host: str = "127.0.0.1", port: int = 8765, unix_path: str = None):
+        """
+        Démarre les processus (préchauffés), le répartiteur et le serveur
+        :param host: Adresse d'écoute (localhost par défaut)
+        :param port: Port d'écoute (0 pour un port libre)
+        :param unix_path: Chemin d'un socket Unix (remplace host et port)
+        :return: L'adresse d'écoute (chemin du socket ou (hôte, port))
+        """
+        loop = asyncio.get_running_loop()
+        self._pool = self._make_pool()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _ping) for _ in range(self.workers)))
+        self._queue, self._slots = asyncio.Queue(self.queue_size), asyncio.Semaphore(self.workers)
+        self._spawn(self._dispatch())
+        if unix_path is not None:
+            if os.path.exists(unix_path): os.unlink(unix_path)
+            self._server = await asyncio.start_unix_server(self._handle, unix_path)
+            return unix_path
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    ##################################################
+    async def stop(self):
+        """ Arrête le serveur, le répartiteur et les processus (les requêtes en attente sont annulées) """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in list(self._tasks): task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._pool is not None: self._pool.shutdown(wait=True, cancel_futures=True)
+        self._server, self._pool = None, None
+
+    ##################################################
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8765, unix_path: str = None):
+        """ Démarre le service et répond jusqu'à l'annulation (Ctrl+C) """
+        address = await self.start(host, port, unix_path)
+        print(f"Service prêt sur {address} ({self.workers} processus)")
+        try: await self._server.serve_forever()
+        finally: await self.stop()
+
+    ##################################################
+    def _spawn(self, coroutine):
+        """ Lance une tâche en gardant une référence (évite qu'elle soit collectée en cours d'exécution) """
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    ##################################################
+    def submit(self, payload: dict):
+        """
+        Ajoute une requête à la file
+        :param payload: Requête décodée
+        :return: Futur de la réponse (statut, résultat)
+        :raise asyncio.QueueFull: Si la file est pleine
+        """
+        size = len(payload["data"]) if "data" in payload else math.inf
+        job = _Job(payload, size, asyncio.get_running_loop().create_future())
+        self._queue.put_nowait(job)
+        return job.future
+
+    ##################################################
+    async def _next_job(self, timeout: float = None):
+        """ Prochaine requête encore attendue (les requêtes abandonnées par leur client sont ignorées) """
+        while True:
+            job = await (self._queue.get() if timeout is None else asyncio.wait_for(self._queue.get(), timeout))
+            if not job.future.done(): return job
+
+    ##################################################
+    async def _dispatch(self):
+        """ Boucle du répartiteur : un lot est envoyé dès qu'un processus est libre """
+        loop = asyncio.get_running_loop()
+        pending = None
+        while True:
+            await self._slots.acquire()
+            job = pending if pending is not None else await self._next_job()
+            pending, batch = None, [job]
+            deadline = loop.time() + self.batch_window
+            while job.size < self.small_size and len(batch) < self.batch_size:
+                try: job = await self._next_job(max(deadline - loop.time(), 0) if self._queue.empty() else None)
+                except asyncio.TimeoutError: break
+                if job.size >= self.small_size:  # Une grosse requête est traitée seule, dans le lot suivant
+                    pending = job
+                    break
+                batch.append(job)
+            self._spawn(self._run(batch))
+
+    ##################################################
+    async def _run(self, batch: list):
+        """ Exécute un lot dans un processus et transmet chaque réponse à sa requête """
+        pool = self._pool
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(pool, _run_batch, [job.payload for job in batch])
+        except BrokenProcessPool as e:
+            # Un processus a été tué : le groupe est recréé une seule fois (plusieurs lots échouent ensemble) et l'ancien est arrêté
+            if self._pool is pool: self._pool = self._make_pool()
+            pool.shutdown(wait=False, cancel_futures=True)
+            results = [(500, f"{type(e).__name__}: {e}")] * len(batch)
+        except Exception as e: results = [(500, f"{type(e).__name__}: {e}")] * len(batch)
+        finally: self._slots.release()
+        for job, result in zip(batch, results):
+            if not job.future.done(): job.future.set_result(result)
+
+    ##################################################
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """ Traite une connexion HTTP (une requête par connexion) """
+        try:
+            headers = {}
+            try:
+                status, body = await self._respond(reader)
+            except asyncio.QueueFull:
+                status, body, headers = 503, {"Error": "Queue is full, retry later."}, {"Retry-After": "1"}
+            except PermissionError as e:
+                status, body = 403, {"Error": str(e)}
+            except (ValueError, KeyError, asyncio.IncompleteReadError) as e:
+                status, body = 400, {"Error": f"{type(e).__name__}: {e}"}
+            except Exception as e:  # Erreur inattendue : le client reçoit tout de même une réponse
+                status, body = 500, {"Error": f"{type(e).__name__}: {e}"}
+            content = json.dumps(_to_json(body)).encode()
+            head = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}", "Content-Type: application/json",
+                    f"Content-Length: {len(content)}", "Connection: close"] + [f"{k}: {v}" for k, v in headers.items()]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + content)
+            await writer.drain()
+        except ConnectionError: pass
+        finally: writer.close()  # Toujours fermer la connexion, même si la réponse n'a pas pu être écrite
+
+    ##################################################
+    async def _respond(self, reader: asyncio.StreamReader):
+        """
+        Lit une requête HTTP et calcule la réponse
+        :return: (statut HTTP, corps de la réponse)
+        """
+        method, target, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+        headers = {}
+        while (line := (await reader.readline()).decode("latin-1").strip()):
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        if length > MAX_BODY_SIZE: return 413, {"Error": f"Body larger than {MAX_BODY_SIZE} bytes."}
+        body = await reader.readexactly(length) if length else b""
+
+        path = target.split("?", 1)[0]
+        if path == "/health":
+            return 200, {"Status": "ok", "Workers": self.workers, "Queued": self._queue.qsize(), "Queue Size": self.queue_size}
+        if path != "/analyze": return 404, {"Error": f"Unknown route {path}."}
+        if method != "POST": return 405, {"Error": "Use POST."}
+
+        if headers.get("content-type", "").startswith("application/octet-stream"):
+            payload = {"data": np.frombuffer(body, dtype="<f8")}
+        else:
+            payload = json.loads(body)
+            if not isinstance(payload, dict) or ("data" in payload) == ("path" in payload):
+                raise ValueError("Body must contain either \"data\" or \"path\".")
+            if "data" in payload: payload["data"] = _as_vector(payload["data"], "data")
+            else: payload["path"] = self._resolve_path(str(payload["path"]))
+            weights = payload.get("weights")
+            if isinstance(weights, list): payload["weights"] = _as_vector(weights, "weights")
+            elif weights is not None and ("data" in payload or not isinstance(weights, (str, int))):  # Nom de colonne : fichiers seulement
+                raise ValueError("\"weights\" must be a list of numbers (or a column of the file).")
+
+        future = self.submit(payload)
+        try: status, result = await asyncio.shield(future)
+        except asyncio.CancelledError:  # Client parti : la requête sera ignorée si elle n'est pas encore partie
+            future.cancel()
+            raise
+        return status, result if status == 200 else {"Error": result}
+
+# ==================================================
+# endregion Service Class
+# ==================================================
+
+# ==================================================
+# region Client Functions
+# ==================================================
+##################################################
+async def request_async(payload, route: str = "/analyze", host: str = "127.0.0.1", port: int = 8765, unix_path: str = None):
+    """
+    Envoie une requête au service
+    :param payload: Corps JSON (dictionnaire), tableau numpy (envoyé en binaire) ou None pour une requête GET
+    :param route: Route du service
+    :param host: Adresse du service
+    :param port: Port du service
+    :param unix_path: Chemin du socket Unix (remplace host et port)
+    :return: (statut HTTP, réponse décodée)
+    """
+    if unix_path is not None: reader, writer = await asyncio.open_unix_connection(unix_path)
+    else: reader, writer = await asyncio.open_connection(host, port)
+    try:
+        if payload is None: method, content_type, body = "GET", "application/json", b""
+        elif isinstance(payload, np.ndarray):
+            method, content_type, body = "POST", "application/octet-stream", np.ascontiguousarray(payload, dtype="<f8").tobytes()
+        else: method, content_type, body = "POST", "application/json", json.dumps(_to_json(payload)).encode()
+        writer.write(f"{method} {route} HTTP/1.1\r\nHost: localhost\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        while (await reader.readline()).strip(): pass  # En-têtes (Connection: close, le corps va jusqu'à la fin)
+        return status, json.loads(await reader.read())
+    finally: writer.close()
+
+##################################################
+def request(payload, route: str = "/analyze", host: str = "127.0.0.1", port: int = 8765, unix_path: str = None):
+    """ Version synchrone de request_async """
+    return asyncio.run(request_async(payload, route, host, port, unix_path))
+
+# ==================================================
+# endregion Client Functions
+# ==================================================
+
+# ==================================================
+# region Tests
+# ==================================================
+async def _self_test(n_requests: int = 64, workers: int = 2):
+    """ Démarre le service sur un port libre et envoie des requêtes concurrentes (petites, grosse, fichier, erreurs) """
+    import tempfile
+    import time
+    folder = tempfile.TemporaryDirectory()
+    service = AnalysisService(workers, queue_size=n_requests, data_dir=folder.name)
+    t = time.perf_counter()
+    host, port = await service.start(port=0)
+    print(f"Service démarré en {time.perf_counter() - t:.2f}s sur {host}:{port}")
+    try:
+        rng = np.random.default_rng(0)
+        print(await request_async(None, "/health", host, port))
+        t = time.perf_counter()
+        answers = await asyncio.gather(*(request_async({"data": rng.normal(5, 2, 500).tolist(), "distributions": ["Normal", "Log"]},
+                                                       host=host, port=port) for _ in range(n_requests)))
+        print(f"{n_requests} petites requêtes en {time.perf_counter() - t:.2f}s, statuts {sorted({s for s, _ in answers})}")
+        print(answers[0][1]["Dataframe"][0], answers[0][1]["Box-Cox"])
+        np.save(os.path.join(folder.name, "data.npy"), rng.gamma(2, 1, 200000))
+        for _ in range(2):  # Le second appel utilise le cache de fichiers du processus
+            t = time.perf_counter()
+            status, answer = await request_async({"path": "data.npy"}, host=host, port=port)
+            print(f"Fichier : {status} {answer['Dataframe'][0]['Distribution']} en {time.perf_counter() - t:.2f}s")
+        for path in ["../data.npy", "/etc/passwd"]:  # Hors du dossier de données : 403
+            status, answer = await request_async({"path": path}, host=host, port=port)
+            assert status == 403, (status, answer)
+            print(f"Fichier {path} : {status} {answer['Error']}")
+        status, answer = await request_async(rng.exponential(1, 100000), host=host, port=port)
+        print(f"Binaire : {status} {answer['Dataframe'][0]['Distribution']}")
+        print(await request_async({"data": [1, 2]}, host=host, port=port))
+        print(await request_async({"data": [1, 2, 3], "path": "x"}, host=host, port=port))
+        for bad in [{"data": 5}, {"data": {"a": 1}}, {"data": [[1, 2], [3, 4]]}, {"data": [1, 2, 3], "weights": "w"}]:  # Corps invalides : 400
+            status, answer = await request_async(bad, host=host, port=port)
+            assert status == 400, (bad, status, answer)
+    finally:
+        await service.stop()
+        folder.cleanup()
+
+if __name__ == "__main__":
+    asyncio.run(_self_test())
+# ==================================================
+# endregion Tests
+# ==================================================
+
+# Liste des symboles à exporter (pour limiter les accès)
+__all__ = ["AnalysisService", "request_async", "request"]
@@ -0,0 +1,137 @@
+""" Plan de données en mémoire partagée : les tableaux sont copiés une seule fois, les processus de calcul les lisent sans copie """
+
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+
+_ATTACHED = {}  # Segments ouverts par ce processus (attach), indexés par nom
+
+##################################################
+def _release(segments: list):
+    """
+    Ferme et supprime des segments (appelée une seule fois, par close ou à la collecte de l'objet propriétaire)
+    :param segments: Liste des segments
+    """
+    for shm in segments:
+        try: shm.close()
+        except BufferError: pass            # Une vue est encore utilisée dans ce processus : la projection sera libérée avec lui
+        try: shm.unlink()
+        except FileNotFoundError: pass      # Déjà supprimé
+
+# ==================================================
+# region Shared Arrays Class
+# ==================================================
+class SharedArrays:
+    """
+    Tableaux nommés placés dans des segments de mémoire partagée (multiprocessing.shared_memory), côté propriétaire.
+    handle est un petit dictionnaire (noms des segments, formes et types) transmis aux processus de calcul à la place des données :
+    ils y accèdent par attach sous forme de vues numpy en lecture seule, sans copie ni sérialisation.
+    Les segments sont supprimés à la sortie du bloc with (succès, erreur ou annulation), par close, ou au plus tard à la collecte de l'objet.
+    """
+    __slots__ = ("handle", "_segments", "_finalizer", "__weakref__")
+
+    ##################################################
+    def __init__(self, arrays: dict):
+        """
+        :param arrays: Dictionnaire nom -> tableau (copié une fois dans un segment partagé)
+        """
+        self.handle, self._segments = {}, []
+        self._finalizer = weakref.finalize(self, _release, self._segments)  # Nettoyage garanti même sans close
+        try:
+            for name, array in arrays.items():
+                array = np.ascontiguousarray(array)
+                shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+                self._segments.append(shm)
+                np.ndarray(array.shape, array.dtype, buffer=shm.buf)[...] = array
+                self.handle[name] = (shm.name, array.shape, array.dtype.str)
+        except BaseException:
+            self.close()
+            raise
+
+    ##################################################
+    def __enter__(self): return self
+
+    ##################################################
+    def __exit__(self, exc_type, exc_value, traceback): self.close()
+
+    ##################################################
+    def __len__(self): return len(self.handle)
+
+    ##################################################
+    def nbytes(self):
+        """
+        Taille totale des segments
+        :return: Le nombre d'octets partagés
+        """
+        return sum(shm.size for shm in self._segments)
+
+    ##################################################
+    def close(self):
+        """ Ferme et supprime tous les segments (sans effet si déjà fait) """
+        self._finalizer()
+
+# ==================================================
+# endregion Shared Arrays Class
+# ==================================================
+
+##################################################
+def attach(handle: dict):
+    """
+    Ouvre les tableaux partagés dans un processus de calcul
+    :param handle: Descripteur des tableaux (SharedArrays.handle)
+    :return: Dictionnaire nom -> vue numpy en lecture seule (aucune copie)
+    """
+    views = {}
+    for name, (shm_name, shape, dtype) in handle.items():
+        if shm_name not in _ATTACHED:
+            try: _ATTACHED[shm_name] = shared_memory.SharedMemory(shm_name, track=False)  # Le propriétaire seul supprime le segment
+            except TypeError: _ATTACHED[shm_name] = shared_memory.SharedMemory(shm_name)  # Python < 3.13
+        view = np.ndarray(shape, np.dtype(dtype), buffer=_ATTACHED[shm_name].buf)
+        view.flags.writeable = False
+        views[name] = view
+    return views
+
+##################################################
+def detach(handle: dict):
+    """
+    Ferme les segments ouverts par attach (les vues doivent avoir été libérées, sinon le segment reste ouvert jusqu'à la fin du processus)
+    :param handle: Descripteur des tableaux (SharedArrays.handle)
+    """
+    for shm_name, _, _ in handle.values():
+        shm = _ATTACHED.get(shm_name)
+        if shm is None: continue
+        try:
+            shm.close()
+            del _ATTACHED[shm_name]
+        except BufferError: pass
+
+# ==================================================
+# region Tests
+# ==================================================
+def _checksum(handle: dict):
+    """ Somme de chaque tableau partagé, calculée dans un processus de calcul """
+    views = attach(handle)
+    res = {name: float(np.sum(v)) for name, v in views.items()}
+    del views
+    detach(handle)
+    return res
+
+if __name__ == "__main__":
+    import time
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context
+
+    data = np.random.default_rng(0).normal(size=10_000_000)
+    t = time.perf_counter()
+    with SharedArrays({"Data": data, "Sorted": np.sort(data)}) as shared:
+        print(f"{shared.nbytes() / 1e6:.0f} Mo partagés en {time.perf_counter() - t:.2f}s : {shared.handle}")
+        with ProcessPoolExecutor(2, mp_context=get_context("spawn")) as pool:
+            print(list(pool.map(_checksum, [shared.handle] * 4)))
+    print(f"Segments supprimés : {shared.handle['Data'][0]}")
+# ==================================================
+# endregion Tests
+# ==================================================
+
+# Liste des symboles à exporter (pour limiter les accès)
+__all__ = ["SharedArrays", "attach", "detach"]
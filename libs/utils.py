@@ -1,68 +1,327 @@
 """ Diverses fonctions utiles """
 
-import matplotlib.pyplot as plt
+import os
+from functools import lru_cache
+
 import numpy as np
-import seaborn as sns
 from scipy import stats
 
+# Pandas n'est importé qu'au premier chargement d'un fichier (voir load_data et load_table) pour accélérer le démarrage
+
 # ==================================================
 # region KDE Functions
 # ==================================================
 ##################################################
-def get_kde(d: np.ndarray):
+def get_kde(d: np.ndarray, gridsize: int = 200, cut: float = 3, weights: np.ndarray = None):
     """
     Calcul de la courbe KDE (Kernel Density Estimation) de la distribution
+    Le calcul reproduit celui de seaborn.kdeplot (bande passante de Scott, grille de 200 points étendue de 3 bandes passantes)
+    sans créer de figure, matplotlib et seaborn ne sont donc pas nécessaires.
     :param d: Distribution
+    :param gridsize: Nombre de points de la courbe
+    :param cut: Extension de la grille au-delà des extrêmes (en nombre de bandes passantes)
+    :param weights: Poids (ou effectifs) de chaque valeur, None pour des poids identiques
     :return: Les données du tracé de la courbe
     """
     if len(d) == 0: raise ValueError("Empty distribution is not allowed.")
-    fig, ax = plt.subplots(figsize=(16, 10), dpi=200)
-    h = sns.kdeplot(d, ax=ax)                                            # Dessin du KDE de la seconde distribution
-    return h.get_lines()[0].get_data()                                   # Récupération des courbes
+    kde = stats.gaussian_kde(d, weights=weights)
+    bw = np.sqrt(kde.covariance.squeeze())                               # Bande passante dans l'unité des données
+    x = np.linspace(np.min(d) - bw * cut, np.max(d) + bw * cut, gridsize)
+    return x, kde(x)
 
 ##################################################
-def get_kde_mse(d1: np.ndarray, d2: np.ndarray, axis: int = 1):
+def get_kde_mse(d1: np.ndarray, d2: np.ndarray, axis: int = 1, w1: np.ndarray = None, w2: np.ndarray = None):
     """
     Calcul de la MSE (Mean Square Error) entre les coordonnées X ou Y des courbes KDE (Kernel Density Estimation) de deux distributions
     :param d1: Première Distribution
     :param d2: Seconde Distribution
     :param axis: Axe du calcul (0 pour X 1 pour Y), 1 par défaut
+    :param w1: Poids de la première distribution (None pour des poids identiques)
+    :param w2: Poids de la seconde distribution (None pour des poids identiques)
     :return: valeur de la MSE
     """
     if len(d1) == 0 or len(d2) == 0: raise ValueError("Empty distribution is not allowed.")
-    kde1, kde2 = get_kde(d1), get_kde(d2)                                # Récupération des courbes
-    return np.mean((kde1[axis] - kde2[axis]) ** 2)                       # Calcul du MSE entre les coordonnées Y des courbes
+    kde1, kde2 = get_kde(d1, weights=w1), get_kde(d2, weights=w2)        # Récupération des courbes
+    return get_curve_mse(kde1, kde2, axis)
 
 ##################################################
-def get_kde_curve_mse(d1: np.ndarray, d2: np.ndarray):
+def get_kde_curve_mse(d1: np.ndarray, d2: np.ndarray, w1: np.ndarray = None, w2: np.ndarray = None):
     """
     Calcul de la MSE (Mean Square Error) entre les courbes KDE (Kernel Density Estimation) de deux distributions
     :param d1: Première Distribution
     :param d2: Seconde Distribution
+    :param w1: Poids de la première distribution (None pour des poids identiques)
+    :param w2: Poids de la seconde distribution (None pour des poids identiques)
     :return: valeur de la MSE
     """
     if len(d1) == 0 or len(d2) == 0: raise ValueError("Empty distribution is not allowed.")
-    kde1, kde2 = get_kde(d1), get_kde(d2)                                # Récupération des courbes
-    return np.mean((kde1[0] - kde2[0]) ** 2 + (kde1[1] - kde2[1]) ** 2)  # Calcul du MSE entre les points des courbes
+    kde1, kde2 = get_kde(d1, weights=w1), get_kde(d2, weights=w2)        # Récupération des courbes
+    return get_curve_mse(kde1, kde2)
+
+##################################################
+def get_curve_mse(kde1: tuple, kde2: tuple, axis: int = None):
+    """
+    Calcul de la MSE (Mean Square Error) entre deux courbes KDE déjà calculées (voir get_kde)
+    :param kde1: Première courbe (X, Y)
+    :param kde2: Seconde courbe (X, Y)
+    :param axis: Axe du calcul (0 pour X 1 pour Y), None pour la distance entre les points des courbes
+    :return: valeur de la MSE
+    """
+    if axis is None: return np.mean((kde1[0] - kde2[0]) ** 2 + (kde1[1] - kde2[1]) ** 2)  # Calcul du MSE entre les points des courbes
+    return np.mean((kde1[axis] - kde2[axis]) ** 2)                                         # Calcul du MSE entre les coordonnées des courbes
 
 # ==================================================
 # endregion KDE Functions
 # ==================================================
 
+# ==================================================
+# region Weighted Functions
+# ==================================================
+##################################################
+def get_moments(d: np.ndarray, weights: np.ndarray = None):
+    """
+    Calcul de l'asymétrie (skewness) et de l'aplatissement (kurtosis de Fisher) d'une distribution éventuellement pondérée
+    :param d: Distribution
+    :param weights: Poids (ou effectifs) de chaque valeur, None pour des poids identiques (identique à stats.skew et stats.kurtosis)
+    :return: Le couple (skewness, kurtosis)
+    """
+    if weights is None: return stats.skew(d), stats.kurtosis(d)
+    mu = np.average(d, weights=weights)
+    centered = d - mu
+    m2, m3, m4 = (np.average(centered ** k, weights=weights) for k in (2, 3, 4))
+    return m3 / m2 ** 1.5, m4 / m2 ** 2 - 3
+
+##################################################
+def get_ks(d1: np.ndarray, d2: np.ndarray, w1: np.ndarray = None, w2: np.ndarray = None):
+    """
+    Test de Kolmogorov-Smirnov à deux échantillons éventuellement pondérés.
+    Les fonctions de répartition sont évaluées sur les valeurs distinctes, le coût dépend du nombre de valeurs (ou de classes), pas des effectifs.
+    :param d1: Première Distribution
+    :param d2: Seconde Distribution
+    :param w1: Poids de la première distribution (None pour des poids identiques)
+    :param w2: Poids de la seconde distribution (None pour des poids identiques)
+    :return: Le couple (statistique, p-value), identique à stats.kstest sans poids
+    """
+    if w1 is None and w2 is None: return tuple(stats.kstest(d1, d2))
+    w1 = np.ones(len(d1)) if w1 is None else np.asarray(w1, dtype=float)
+    w2 = np.ones(len(d2)) if w2 is None else np.asarray(w2, dtype=float)
+    i1, i2 = np.argsort(d1), np.argsort(d2)
+    s1, s2 = np.asarray(d1)[i1], np.asarray(d2)[i2]
+    c1, c2 = np.cumsum(w1[i1]), np.cumsum(w2[i2])
+    support = np.concatenate([s1, s2])
+    cdf1 = np.concatenate([[0.0], c1 / c1[-1]])[np.searchsorted(s1, support, side="right")]
+    cdf2 = np.concatenate([[0.0], c2 / c2[-1]])[np.searchsorted(s2, support, side="right")]
+    statistic = np.max(np.abs(cdf1 - cdf2))
+    # Tailles effectives (Kish) pour la loi asymptotique de la statistique
+    n1, n2 = c1[-1] ** 2 / np.sum(w1 ** 2), c2[-1] ** 2 / np.sum(w2 ** 2)
+    return statistic, stats.kstwobign.sf(statistic * np.sqrt(n1 * n2 / (n1 + n2)))
+
+##################################################
+def is_integer_data(data: np.ndarray):
+    """
+    Vérifie si une distribution ne contient que des entiers positifs ou nuls (données de comptage)
+    :param data: Distribution
+    :return: Vrai si toutes les valeurs sont des entiers positifs ou nuls
+    """
+    data = np.asarray(data)
+    if np.issubdtype(data.dtype, np.integer): return bool(np.min(data) >= 0)
+    return bool(np.issubdtype(data.dtype, np.floating) and np.all(np.isfinite(data)) and np.min(data) >= 0 and np.all(np.mod(data, 1) == 0))
+
+##################################################
+def collapse(data: np.ndarray, weights: np.ndarray = None):
+    """
+    Regroupe une distribution discrète en valeurs distinctes et effectifs.
+    np.bincount est utilisé pour des entiers positifs de faible amplitude (linéaire), np.unique sinon.
+    :param data: Distribution (entiers positifs ou nuls pour profiter de np.bincount)
+    :param weights: Poids ou effectifs de chaque valeur, None pour des poids identiques
+    :return: Le couple (valeurs distinctes triées, effectifs)
+    """
+    data = np.asarray(data)
+    if len(data) > 0 and is_integer_data(data) and np.max(data) <= 4 * len(data):
+        counts = np.bincount(data.astype(np.int64), weights=weights)
+        support = np.flatnonzero(counts)
+        return support, counts[support]
+    support, inverse = np.unique(data, return_inverse=True)
+    return support, np.bincount(inverse, weights=weights, minlength=len(support))
+
+# ==================================================
+# endregion Weighted Functions
+# ==================================================
+
+# ==================================================
+# region Two-Sample Functions
+# ==================================================
+# Coefficients d'interpolation des valeurs critiques (table 2 de Scholz et Stephens 1987), niveaux de signification associés
+AD_B0 = np.array([0.675, 1.281, 1.645, 1.96, 2.326, 2.573, 3.085])
+AD_B1 = np.array([-0.245, 0.25, 0.678, 1.149, 1.822, 2.364, 3.615])
+AD_B2 = np.array([-0.105, -0.305, -0.362, -0.391, -0.396, -0.345, -0.154])
+AD_SIGNIFICANCE = np.array([0.25, 0.1, 0.05, 0.025, 0.01, 0.005, 0.001])
+KS_EXACT_SIZE = 10000  # Taille maximale pour laquelle la p-value de Kolmogorov-Smirnov est exacte (comme stats.ks_2samp)
+TWO_SAMPLE_CHUNK = 65536  # Nombre de groupes de valeurs égales traités par bloc (mémoire de travail de two_sample_tests)
+
+##################################################
+def _ad_harmonic_sums(n: int, chunk: int = 65536):
+    """
+    Sommes harmoniques h et g de la variance de la statistique d'Anderson-Darling (comme stats.anderson_ksamp),
+    calculées par blocs : la mémoire ne dépend pas de la taille des échantillons
+    :param n: Taille totale des échantillons
+    :param chunk: Taille des blocs
+    :return: Le couple (h, g)
+    """
+    h_run, g = 0.0, 0.0
+    for start in range(0, n - 2, chunk):
+        j = np.arange(start, min(start + chunk, n - 2))
+        h_cumsum = h_run + np.cumsum(1.0 / (n - 1 - j))
+        g += np.sum(h_cumsum / (j + 2))
+        h_run = h_cumsum[-1]
+    return h_run + 1, g
+
+##################################################
+def two_sample_tests(d1: np.ndarray, d2: np.ndarray, presorted: bool = False):
+    """
+    Tests à deux échantillons calculés ensemble : chaque échantillon est trié une fois, les deux sont fusionnés (fusion linéaire
+    de deux suites triées) et les fonctions de répartition empiriques sont lues sur les groupes de valeurs égales de la fusion.
+    Les résultats sont ceux de stats.ks_2samp, stats.anderson_ksamp (version midrank) et stats.wasserstein_distance.
+    Des échantillons float32 sont triés et fusionnés en float32 (voir le dtype de check_distributions), et les statistiques sont
+    accumulées par blocs de TWO_SAMPLE_CHUNK groupes : seuls la fusion, les effectifs cumulés et les fins de groupes ont la taille des données.
+    :param d1: Première Distribution
+    :param d2: Seconde Distribution
+    :param presorted: Vrai si les deux distributions sont déjà triées
+    :return: Un dictionnaire contenant la statistique et la p-value de Kolmogorov-Smirnov, la statistique et la p-value
+    d'Anderson-Darling et la distance de Wasserstein
+    """
+    s1, s2 = np.asarray(d1), np.asarray(d2)
+    dtype = np.result_type(s1, s2, np.float32)                           # float32 conservé, entiers et float64 en float64
+    s1, s2 = s1.astype(dtype, copy=False), s2.astype(dtype, copy=False)
+    if not presorted: s1, s2 = np.sort(s1), np.sort(s2)
+    n1, n2 = len(s1), len(s2)
+    if n1 == 0 or n2 == 0: raise ValueError("Empty distribution is not allowed.")
+    n = n1 + n2
+    z = np.concatenate([s1, s2])
+    if max(n1, n2) <= KS_EXACT_SIZE: ks_p = stats.ks_2samp(s1, s2).pvalue  # Loi exacte, rapide pour ces tailles
+    del s1, s2
+    order = np.argsort(z, kind="stable")                                  # Deux suites triées : fusion en temps linéaire
+    z = z[order]
+    cum1 = np.cumsum(order < n1, dtype=np.int32 if n < 2 ** 31 else np.int64)  # Valeurs de d1 parmi les i premières de la fusion
+    del order
+    last = np.append(np.flatnonzero(z[1:] != z[:-1]), n - 1)             # Dernière position de chaque groupe de valeurs égales
+    if len(last) < 2: raise ValueError("At least two distinct values are required.")
+
+    ks_max, ks_min, wasserstein, a2 = 0.0, 0.0, 0.0, 0.0
+    prev_last, prev_m1, prev_diff, prev_value = -1, 0, 0.0, z[0]
+    for start in range(0, len(last), TWO_SAMPLE_CHUNK):
+        pos = last[start:start + TWO_SAMPLE_CHUNK]
+        m1 = cum1[pos].astype(np.int64)                                  # Valeurs de d1 inférieures ou égales à chaque valeur distincte
+        m2 = pos + 1 - m1
+        size = np.diff(pos, prepend=prev_last)                           # Taille de chaque groupe
+        d_m1 = np.diff(m1, prepend=prev_m1)
+        values = z[pos].astype(np.float64)
+        # Kolmogorov-Smirnov
+        diff = m1 / n1 - m2 / n2
+        ks_max, ks_min = max(ks_max, np.max(diff)), min(ks_min, np.min(diff))
+        # Wasserstein : aire entre les fonctions de répartition, constantes entre deux valeurs distinctes
+        wasserstein += np.dot(np.fabs(np.concatenate([[prev_diff], diff[:-1]])), np.diff(values, prepend=prev_value))
+        # Anderson-Darling (midrank) : rangs moyens des groupes de valeurs égales
+        b = pos + 1 - size / 2.0
+        denominator = b * (n - b) - n * size / 4.0
+        for m, dm, ni in ((m1, d_m1, n1), (m2, size - d_m1, n2)):
+            a2 += np.sum(size / n * (n * (m - dm / 2.0) - b * ni) ** 2 / denominator) / ni
+        prev_last, prev_m1, prev_diff, prev_value = pos[-1], m1[-1], diff[-1], values[-1]
+    ks = max(ks_max, np.clip(-ks_min, 0, 1))
+    if max(n1, n2) > KS_EXACT_SIZE: ks_p = np.clip(stats.kstwo.sf(ks, np.round(n1 * n2 / n)), 0, 1)
+    a2 *= (n - 1.0) / n
+    # Normalisation et p-value interpolée entre les valeurs critiques (bornée entre 0.1% et 25%)
+    k, (h, g), H = 2, _ad_harmonic_sums(n), 1.0 / n1 + 1.0 / n2
+    a = (4 * g - 6) * (k - 1) + (10 - 6 * g) * H
+    b = (2 * g - 4) * k ** 2 + 8 * h * k + (2 * g - 14 * h - 4) * H - 8 * h + 4 * g - 6
+    c = (6 * h + 2 * g - 2) * k ** 2 + (4 * h - 4 * g + 6) * k + (2 * h - 6) * H + 4 * h
+    d = (2 * h + 6) * k ** 2 - 4 * h * k
+    sigma2 = (a * n ** 3 + b * n ** 2 + c * n + d) / ((n - 1.0) * (n - 2.0) * (n - 3.0))
+    ad = (a2 - (k - 1)) / np.sqrt(sigma2)
+    critical = AD_B0 + AD_B1 / np.sqrt(k - 1) + AD_B2 / (k - 1)
+    if ad < critical.min(): ad_p = AD_SIGNIFICANCE.max()
+    elif ad > critical.max(): ad_p = AD_SIGNIFICANCE.min()
+    else: ad_p = np.exp(np.polyval(np.polyfit(critical, np.log(AD_SIGNIFICANCE), 2), ad))
+
+    return {"KS Statistic": ks, "KS P-Value": ks_p, "AD Statistic": ad, "AD P-Value": ad_p, "Wasserstein Distance": wasserstein}
+
+# ==================================================
+# endregion Two-Sample Functions
+# ==================================================
+
+# ==================================================
+# region Parallel Functions
+# ==================================================
+##################################################
+@lru_cache(maxsize=None)
+def _thread_pool(threads: int):
+    """
+    Groupe de threads partagé (créé une seule fois par taille)
+    :param threads: Nombre de threads
+    :return: Le groupe de threads
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(threads, thread_name_prefix="metrics")
+
+##################################################
+def run_tasks(tasks: dict, threads: int = 1):
+    """
+    Exécute des calculs dépendant les uns des autres sur un groupe de threads : chaque calcul est lancé dès que ses dépendances sont prêtes.
+    Les noyaux numpy et scipy (tri, évaluation des KDE, réductions) libèrent le GIL, les calculs indépendants avancent donc en parallèle.
+    :param tasks: Dictionnaire nom -> (fonction, noms des dépendances), la fonction reçoit les résultats des dépendances dans cet ordre
+    :param threads: Nombre de threads (1 exécute les calculs dans l'ordre du dictionnaire, sans thread)
+    :return: Dictionnaire nom -> résultat
+    """
+    results = {}
+    if threads <= 1:
+        for name, (func, deps) in tasks.items():
+            if any(d not in results for d in deps): raise ValueError(f"Dependencies of {name} must be declared before it.")
+            results[name] = func(*(results[d] for d in deps))
+        return results
+
+    from concurrent.futures import FIRST_COMPLETED, wait
+    pool, pending, running = _thread_pool(threads), dict(tasks), {}
+    while pending or running:
+        for name, (func, deps) in list(pending.items()):
+            if all(d in results for d in deps):
+                running[pool.submit(func, *(results[d] for d in deps))] = name
+                del pending[name]
+        if not running: raise ValueError(f"Unresolved dependencies : {list(pending)}.")
+        done, _ = wait(running, return_when=FIRST_COMPLETED)
+        for future in done: results[running.pop(future)] = future.result()
+    return results
+
+# ==================================================
+# endregion Parallel Functions
+# ==================================================
+
 # ==================================================
 # region Transform Functions
 # ==================================================
 ##################################################
-def box_cox_test(data: np.ndarray):
+def box_cox_test(data: np.ndarray, weights: np.ndarray = None):
     """
     Lance un calcul d'une transformation de Box Cox.
     :param data: Distribution à analyser
+    :param weights: Poids (ou effectifs) de chaque valeur, None pour des poids identiques
     :return: Retourne un dictionnaire contenant les données transformées, le lambda de la transformation ainsi que la nouvelle moyenne et ecart-type.
     """
     if len(data) == 0: raise ValueError("Empty array is not allowed.")
     if np.all(data == data[0]) or np.any(data <= 0): return None
-    transformed, lambda_ = stats.boxcox(data)
-    return dict(Transformed=transformed, Lambda=lambda_, Mu=np.mean(transformed), Sigma=np.std(transformed))
+    # Maximisation de la log-vraisemblance (éventuellement pondérée) de Box-Cox, comme stats.boxcox (même recherche de Brent) :
+    # stats.boxcox ne gère pas les poids et alloue une trentaine de tableaux de la taille des données, ici un seul par évaluation
+    from scipy.optimize import minimize_scalar
+    total = len(data) if weights is None else np.sum(weights)
+    sum_log = np.sum(np.log(data)) if weights is None else np.dot(weights, np.log(data))
+    def cost(l):
+        y = stats.boxcox(data, l)
+        y -= np.average(y, weights=weights)
+        y *= y
+        return -((l - 1) * sum_log - total / 2 * np.log(np.average(y, weights=weights)))
+    lambda_ = minimize_scalar(cost, bracket=(-2.0, 2.0)).x
+    transformed = stats.boxcox(data, lambda_)
+    mu = np.average(transformed, weights=weights)
+    return dict(Transformed=transformed, Lambda=lambda_, Mu=mu, Sigma=np.sqrt(np.average((transformed - mu) ** 2, weights=weights)))
 
 ##################################################
 def transform(data: np.ndarray):
@@ -84,6 +343,103 @@ def transform(data: np.ndarray):
 # endregion Transform Functions
 # ==================================================
 
+# ==================================================
+# region Load Functions
+# ==================================================
+BINARY_EXTENSIONS = (".bin", ".raw", ".dat")
+ARROW_EXTENSIONS = (".arrow", ".feather", ".ipc")
+PARQUET_EXTENSIONS = (".parquet", ".pq")
+
+##################################################
+def as_readonly(data, dtype=None):
+    """
+    Renvoie une vue en lecture seule du tableau sans copier les données (si possible).
+    Un tableau déjà en lecture seule est renvoyé tel quel, plusieurs analyses partagent ainsi la même référence.
+    :param data: Tableau numpy, Série pandas ou liste de valeurs
+    :param dtype: Type de stockage souhaité (np.float32 par exemple), None conserve le type d'origine
+    :return: Vue numpy 1D non modifiable partageant la mémoire de l'entrée (une seule copie si le type change)
+    """
+    if isinstance(data, np.ndarray) and data.ndim == 1 and not data.flags.writeable and (dtype is None or data.dtype == dtype):
+        return data
+    view = np.asarray(data, dtype=dtype).ravel().view()  # ravel ne copie que si le tableau n'est pas contigu
+    view.flags.writeable = False                         # Seule la vue est verrouillée, l'original reste modifiable
+    return view
+
+##################################################
+def load_data(path: str, column=None, dtype=np.float64):
+    """
+    Charge une colonne de données depuis un fichier sans passer par le texte quand c'est possible.
+    Formats supportés :
+    - .npy : projeté en mémoire (memory-map), aucune lecture complète du fichier
+    - .bin / .raw / .dat : tampon binaire brut de flottants (memory-map également)
+    - .arrow / .feather / .ipc : colonne Arrow (projetée en mémoire si pyarrow est disponible)
+    - .parquet / .pq : colonne Parquet (seule la colonne demandée est lue)
+    - .csv et autres : lecture texte via pandas
+    :param path: Chemin du fichier
+    :param column: Nom ou indice de la colonne à charger (par défaut la première)
+    :param dtype: Type des valeurs pour les tampons binaires bruts (float64 par défaut)
+    :return: Tableau numpy 1D en lecture seule
+    """
+    import pandas as pd
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npy":
+        data = np.load(path, mmap_mode="r")
+        if data.ndim > 1: data = data[:, 0 if column is None else column]
+    elif ext in BINARY_EXTENSIONS:
+        data = np.memmap(path, dtype=dtype, mode="r")
+    elif ext in ARROW_EXTENSIONS or ext in PARQUET_EXTENSIONS:
+        data = _load_arrow_column(path, column, ext in PARQUET_EXTENSIONS)
+    else:
+        df = pd.read_csv(path)
+        data = df.iloc[:, 0] if column is None else (df.iloc[:, column] if isinstance(column, int) else df[column])
+    return as_readonly(data)
+
+##################################################
+def _load_arrow_column(path: str, column, parquet: bool):
+    """
+    Charge une colonne Arrow ou Parquet.
+    :param path: Chemin du fichier
+    :param column: Nom ou indice de la colonne à charger (par défaut la première)
+    :param parquet: Vrai pour un fichier Parquet, Faux pour un fichier Arrow IPC
+    :return: Tableau numpy 1D
+    """
+    import pandas as pd
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:  # Sans pyarrow, pandas peut encore utiliser un autre moteur (fastparquet par exemple)
+        df = pd.read_parquet(path) if parquet else pd.read_feather(path)
+        return df[column] if isinstance(column, str) else df.iloc[:, column or 0]
+
+    if parquet:  # Seule la colonne demandée est lue
+        name = column if isinstance(column, str) else pq.read_schema(path).names[column or 0]
+        col = pq.read_table(path, columns=[name], memory_map=True).column(0)
+    else:        # Le fichier IPC est projeté en mémoire, les tampons ne sont pas copiés
+        table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        col = table.column(column if isinstance(column, str) else column or 0)
+    if col.num_chunks == 1 and col.null_count == 0: return col.chunk(0).to_numpy(zero_copy_only=False)
+    return col.to_numpy()
+
+##################################################
+def load_table(path: str):
+    """
+    Charge un fichier complet sous forme de Dataframe (pour l'affichage).
+    :param path: Chemin du fichier
+    :return: Dataframe, les tableaux binaires ou .npy donnent une colonne par dimension
+    """
+    import pandas as pd
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npy" or ext in BINARY_EXTENSIONS:
+        data = np.load(path, mmap_mode="r") if ext == ".npy" else np.memmap(path, dtype=np.float64, mode="r")
+        return pd.DataFrame(data.reshape(len(data), -1))
+    if ext in PARQUET_EXTENSIONS: return pd.read_parquet(path)
+    if ext in ARROW_EXTENSIONS: return pd.read_feather(path)
+    return pd.read_csv(path)
+
+# ==================================================
+# endregion Load Functions
+# ==================================================
+
 # ==================================================
 # region Tests
 # ==================================================
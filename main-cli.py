@@ -0,0 +1,78 @@
+""" Fichier principal en ligne de commande """
+
+import argparse
+import os
+
+from libs.distributions import check_distributions, ALL_DISTRIBUTIONS
+from libs.models import load_model
+from libs.report import make_distribution_report
+from libs.utils import load_data
+
+result_path = "Output"
+
+##################################################
+def parse_args(argv=None):
+    """
+    Lecture des arguments de la ligne de commande
+    :param argv: Liste des arguments (par défaut ceux du programme)
+    :return: Arguments lus
+    """
+    parser = argparse.ArgumentParser(description="Distribution Finder")
+    parser.add_argument("file", help="Fichier de données (.csv, .npy, .parquet, .arrow, .feather, .bin, .raw)")
+    parser.add_argument("-c", "--column", default=None, help="Nom ou indice de la colonne à analyser (par défaut la première)")
+    parser.add_argument("-w", "--weights", default=None, help="Nom ou indice de la colonne des effectifs pour un histogramme déjà agrégé (valeur, effectif)")
+    parser.add_argument("--dtype", default="float64", help="Type des valeurs pour les fichiers binaires bruts (float64 par défaut)")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1, help="Nombre de threads pour les métriques (par défaut le nombre de cœurs)")
+    parser.add_argument("--progressive", action="store_true", help="Analyse des sous-échantillons croissants et s'arrête quand le classement est stable")
+    parser.add_argument("--fast", action="store_true", help="Classement par log-vraisemblance (BIC) seulement : aucune métrique KDE, ni figure ni rapport")
+    parser.add_argument("--save-model", action="store_true", help="Enregistre le modèle de la distribution la plus proche (.npz) dans le dossier de résultat")
+    parser.add_argument("--score", default=None, metavar="MODEL", help="Évalue les données par rapport à un modèle enregistré (.npz) au lieu de lancer l'analyse")
+    parser.add_argument("-o", "--output", default=None, help="Dossier de résultat (par défaut \"Output\" à côté du fichier)")
+    return parser.parse_args(argv)
+
+##################################################
+def print_provisional(results):
+    """
+    Affiche le classement provisoire d'une étape de l'analyse progressive
+    :param results: Résultat de l'étape (voir check_distributions)
+    """
+    if results["Final"]: return  # Le résultat définitif est affiché en entier par main
+    print(f"Classement provisoire sur {results['Rows']} lignes :")
+    print(results["Dataframe"][["Distribution", "MSE", "Kolmogorov-Smirnov Test", "BIC"]].head(3).to_string(index=False))
+
+##################################################
+def main(argv=None):
+    """ Calcul des distributions et génération du rapport """
+    args = parse_args(argv)
+    column, weights = (int(c) if c is not None and c.isdigit() else c for c in (args.column, args.weights))
+    data = load_data(args.file, column, args.dtype)
+    if weights is not None: weights = load_data(args.file, weights)
+
+    if args.score is not None:  # Évaluation rapide d'un nouveau lot, sans ajustement
+        model = load_model(args.score)
+        print(model)
+        for key, value in model.score(data).items(): print(f"  {key} : {value}")
+        return
+
+    path = args.output if args.output is not None else os.path.join(os.path.dirname(args.file), result_path)
+    os.makedirs(path, exist_ok=True)  # Créer le dossier de résultat (la première fois, il n'existe pas)
+    file_name = os.path.splitext(os.path.basename(args.file))[0]
+    if column is not None: file_name += f"-{column}"
+
+    print(f"Calcul pour \"{args.file}\" ({len(data)} samples)")
+    results = check_distributions(data, ALL_DISTRIBUTIONS, weights=weights, threads=args.threads, progressive=args.progressive,
+                                  callback=print_provisional, metrics=not args.fast)
+    results["Dataframe"].to_csv(os.path.join(path, f"{file_name}_Results.csv"), index=False)
+    if not args.fast: make_distribution_report(data, results, f"{file_name}_Report", path)
+    print(results["Dataframe"].to_string(index=False))
+    best = results["Dataframe"].iloc[0, 0]
+    print(f"{'Résultats enregistrés' if args.fast else 'Rapport généré'} ici \"{path}\". "
+          f"Distribution la plus proche : {best} (sur {results['Rows']} lignes / {len(data)}).")
+    if args.save_model:
+        model_path = os.path.join(path, f"{file_name}_Model.npz")
+        next(a for a in results["Analysis"] if a.type == best).save(model_path)
+        print(f"Modèle enregistré ici \"{model_path}\".")
+
+##################################################
+if __name__ == "__main__":
+    main()
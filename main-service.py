@@ -0,0 +1,54 @@
+""" Fichier principal du service d'analyse local (HTTP sur localhost ou socket Unix) """
+
+import argparse
+import asyncio
+import ipaddress
+
+from libs.service import AnalysisService
+
+##################################################
+def _is_loopback(host: str):
+    """
+    Vérifie qu'une adresse d'écoute est locale
+    :param host: Nom ou adresse IP
+    :return: Vrai pour localhost ou une adresse de bouclage (127.0.0.0/8, ::1)
+    """
+    if host == "localhost": return True
+    try: return ipaddress.ip_address(host).is_loopback
+    except ValueError: return False
+
+##################################################
+def parse_args(argv=None):
+    """
+    Lecture des arguments de la ligne de commande
+    :param argv: Liste des arguments (par défaut ceux du programme)
+    :return: Arguments lus
+    """
+    parser = argparse.ArgumentParser(description="Distribution Finder - Service")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse d'écoute (localhost par défaut)")
+    parser.add_argument("--allow-remote", action="store_true",
+                        help="Autorise une adresse d'écoute autre que localhost (le service n'a aucune authentification)")
+    parser.add_argument("--data-dir", default=None, help="Dossier des fichiers accessibles par \"path\" (requêtes de fichiers refusées sinon)")
+    parser.add_argument("--port", type=int, default=8765, help="Port d'écoute (8765 par défaut)")
+    parser.add_argument("--unix", default=None, metavar="PATH", help="Écoute sur un socket Unix au lieu d'un port")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus de calcul (par défaut le nombre de cœurs)")
+    parser.add_argument("--queue-size", type=int, default=64, help="Nombre maximal de requêtes en attente avant de répondre 503")
+    parser.add_argument("--batch-size", type=int, default=16, help="Nombre maximal de petites requêtes regroupées dans un lot")
+    args = parser.parse_args(argv)
+    if args.unix is None and not args.allow_remote and not _is_loopback(args.host):
+        parser.error(f"--host {args.host} n'est pas une adresse locale : le service serait accessible depuis le réseau sans authentification "
+                     f"(ajouter --allow-remote pour le confirmer)")
+    return args
+
+##################################################
+def main(argv=None):
+    """ Lancement du service jusqu'à Ctrl+C """
+    args = parse_args(argv)
+    service = AnalysisService(args.workers, args.queue_size, args.batch_size, data_dir=args.data_dir)
+    if not _is_loopback(args.host) and args.unix is None: print(f"Attention : service accessible depuis le réseau sur {args.host}, sans authentification.")
+    try: asyncio.run(service.serve_forever(args.host, args.port, args.unix))
+    except KeyboardInterrupt: print("Service arrêté.")
+
+##################################################
+if __name__ == "__main__":
+    main()
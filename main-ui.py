@@ -6,8 +6,7 @@ import pandas as pd
 from PyQt6.QtGui import QAction, QPixmap
 from PyQt6.QtWidgets import QApplication, QDialog, QFileDialog, QLabel, QMainWindow, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget
 
-from libs.distributions import check_distributions
-from libs.report import make_distribution_report
+from libs.utils import load_table
 
 result_path = "Output"
 
@@ -42,6 +41,7 @@ class DistributionFinderUI(QMainWindow):
 
         self.table = QTableWidget()
         self.status = QLabel()
+        self.progressive_action = None
         self.dataframe = pd.DataFrame()
         self.path = ""
         self.file_name = ""
@@ -54,9 +54,9 @@ class DistributionFinderUI(QMainWindow):
         self.setGeometry(100, 100, 800, 600)            # Position de la fenêtre
 
         menubar = self.menuBar()
-        open_action = QAction('Ouvrir CSV (Ctrl+O)', self)
+        open_action = QAction('Ouvrir (Ctrl+O)', self)
         open_action.setShortcut('Ctrl+O')               # Raccourci Ctrl+O pour Ouvrir
-        open_action.triggered.connect(self.openCSV)     # Connecter à la méthode openCSV
+        open_action.triggered.connect(self.openFile)    # Connecter à la méthode openFile
         menubar.addAction(open_action)
 
         process_action = QAction('Process (Ctrl+P)', self)
@@ -64,6 +64,11 @@ class DistributionFinderUI(QMainWindow):
         process_action.triggered.connect(self.process)  # Connecter à la méthode process
         menubar.addAction(process_action)
 
+        self.progressive_action = QAction('Analyse progressive', self)
+        self.progressive_action.setCheckable(True)      # Désactivée par défaut : le rapport porte sur toutes les lignes
+        self.progressive_action.setToolTip("Classement provisoire sur des sous-échantillons, arrêt dès qu'il est stable")
+        menubar.addAction(self.progressive_action)
+
         self.status.setText('Prêt')                     # Message par défaut dans la barre d'état
 
         central_widget = QWidget()
@@ -76,18 +81,19 @@ class DistributionFinderUI(QMainWindow):
         layout.addWidget(self.status)                   # Ajout de la barre d'état
 
     ##################################################
-    def openCSV(self):
-        """ Ouvre un fichier CSV """
-        file_path, _ = QFileDialog.getOpenFileName(self, "Ouvrir CSV", "", "CSV Files (*.csv)")
+    def openFile(self):
+        """ Ouvre un fichier de données (CSV, NumPy, Parquet, Arrow ou binaire brut) """
+        file_path, _ = QFileDialog.getOpenFileName(self, "Ouvrir", "", "Data Files (*.csv *.npy *.parquet *.pq *.arrow *.feather *.bin *.raw);;"
+                                                                       "CSV Files (*.csv)")
         if file_path:
             self.status.setText(f"Ouverture du fichier \"{file_path}\".")
-            self.loadCSV(file_path)
+            self.loadFile(file_path)
             self.status.setText(f"Fichier \"{file_path}\" ouvert.")
 
     ##################################################
-    def loadCSV(self, file_path):
-        """ Charge un fichier CSV """
-        self.dataframe = pd.read_csv(file_path)                                      # Charger le CSV dans le DataFrame
+    def loadFile(self, file_path):
+        """ Charge un fichier de données """
+        self.dataframe = load_table(file_path)                                       # Charger le fichier dans le DataFrame
         self.path, self.file_name = os.path.split(file_path)                         # Séparer le chemin du fichier et le nom
         self.file_name = os.path.splitext(self.file_name)[0]                         # Obtention du nom de fichier sans extension
         self.path = os.path.join(self.path, result_path)                             # Ajout du dossier de résultat au chemin
@@ -95,7 +101,7 @@ class DistributionFinderUI(QMainWindow):
 
         self.table.setColumnCount(len(self.dataframe.columns))                       # Définition du nombre de colonnes
         self.table.setRowCount(len(self.dataframe))                                  # Définition du nombre de lignes
-        self.table.setHorizontalHeaderLabels(self.dataframe.columns)                 # Titre des colonnes
+        self.table.setHorizontalHeaderLabels([str(c) for c in self.dataframe.columns])  # Titre des colonnes
 
         for row_num in range(len(self.dataframe)):
             for col_num in range(len(self.dataframe.columns)):
@@ -112,9 +118,24 @@ class DistributionFinderUI(QMainWindow):
         img_window = ImageWindow(image_path, parent=self)
         img_window.exec()
 
+    ##################################################
+    def showProvisional(self, results, i, col_name):
+        """
+        Affiche le classement provisoire d'une étape de l'analyse progressive
+        :param results: Résultat de l'étape (voir check_distributions)
+        :param i: Indice de la colonne
+        :param col_name: Nom de la colonne
+        """
+        best = ", ".join(results["Dataframe"]["Distribution"].head(3))
+        state = "définitif" if results["Final"] else "provisoire"
+        self.status.setText(f"Colonne {i} ({col_name}) : classement {state} sur {results['Rows']} lignes : {best}...")
+        QApplication.processEvents()  # Rafraîchir la fenêtre pendant le calcul
+
     ##################################################
     def process(self):
         """ Calcul des distributions et génération du rapport """
+        from libs.distributions import check_distributions  # Import au premier calcul pour que la fenêtre s'ouvre rapidement
+        from libs.report import make_distribution_report
         selected_items = self.table.selectedItems()
         if selected_items:
             column = set(item.column() for item in selected_items)
@@ -124,11 +145,14 @@ class DistributionFinderUI(QMainWindow):
                 data = self.dataframe.iloc[:, i]
                 file_name = f"{self.file_name}-{col_name}"
                 self.status.setText(f"Colonne {i} ({col_name}) sélectionnée, calcul en cours...")
-                results = check_distributions(data)
+                # Métriques en parallèle, analyse progressive si elle est cochée : un classement provisoire s'affiche après chaque sous-échantillon
+                results = check_distributions(data, threads=os.cpu_count() or 1, progressive=self.progressive_action.isChecked(),
+                                              callback=lambda r: self.showProvisional(r, i, col_name))
                 results["Dataframe"].to_csv(os.path.join(self.path, f"{file_name}_Results.csv"), index=False)
                 make_distribution_report(data, results, f"{file_name}_Report", self.path)
                 self.status.setText(f"Rapport généré ici \"{self.path}\" pour la colonne {i} ({col_name}). "
-                                    f"Distribution la plus proche : {results['Dataframe'].iloc[0][0]}.")
+                                    f"Distribution la plus proche : {results['Dataframe'].iloc[0, 0]} "
+                                    f"(sur {results['Rows']} lignes / {len(data)}).")
                 valid_name = file_name.replace(" ", "_")
                 self.openImg(os.path.join(self.path, f"{valid_name}_Report-001.png"))
             else:
@@ -19,7 +19,8 @@ for n in sizes:
              "Exponential": np.random.exponential(3.2, n),
              "Power":       np.random.power(2.5, n),
              "Beta":        np.random.beta(5.5, 2.2, n),
-             "Gamma":       np.random.gamma(3.7, 2.0, n)}
+             "Gamma":       np.random.gamma(3.7, 2.0, n),
+             "Poisson":     np.random.poisson(4.2, n)}
 
     for k, v in datas.items():
         print(f"Calcul pour la distribution {k} avec {n} samples")